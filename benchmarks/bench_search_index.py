@@ -0,0 +1,95 @@
+"""
+Benchmark the search index builder as the corpus grows.
+
+Usage: python benchmarks/bench_search_index.py [--source eo/eo.json]
+
+Without --source the records are synthetic, with words drawn from a Zipf-like
+distribution so that the vocabulary keeps growing with the corpus, as it does
+for real summaries. With --source the records of an existing eo.json are
+repeated under new EO numbers to reach each size.
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import random
+import time
+from pathlib import Path
+
+from propagate.search_index import build_search_index
+
+SIZES = [250, 500, 1000, 2000, 4000, 8000]
+VOCABULARY_SIZE = 50_000
+# every text field of a summary record, indexed or not
+RECORD_FIELDS = [
+    "title", "summary", "purpose", "key_industries", "economic_effects",
+    "geopolitical_effects", "positive_impacts", "negative_impacts",
+    "deeper_dive", "categories.policy_domain", "categories.regulatory_impact",
+    "categories.constitutional_authority", "categories.political_context",
+]
+FIELD_WORDS = {"title": 10, "summary": 60, "deeper_dive": 400}
+
+
+def synthetic_records(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(VOCABULARY_SIZE)]
+    cum_weights = list(
+        itertools.accumulate(1 / (i + 1) for i in range(VOCABULARY_SIZE))
+    )
+    records = []
+    for n in range(count):
+        record = {"eo_number": 10000 + n}
+        for field in RECORD_FIELDS:
+            length = FIELD_WORDS.get(field, 40)
+            text = " ".join(rng.choices(words, cum_weights=cum_weights, k=length))
+            if field.startswith("categories."):
+                record.setdefault("categories", {})[field.split(".")[1]] = text
+            else:
+                record[field] = text
+        records.append(record)
+    return records
+
+
+def repeated_records(source: list[dict], count: int) -> list[dict]:
+    """The first `count` records of `source`, repeated if it is shorter."""
+    return [
+        source[n % len(source)] | {"eo_number": 10000 + n} for n in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", type=Path, help="eo.json to take records from")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+
+    if args.source:
+        source = json.loads(args.source.read_text())["eos"]
+    else:
+        # smaller corpora are prefixes of the largest one
+        source = synthetic_records(max(args.sizes))
+
+    print(
+        f"{'records':>8} {'build s':>8} {'terms':>8} {'index KB':>9}"
+        f" {'gzip KB':>8} {'B/record':>9} {'records KB':>11}"
+    )
+    for size in args.sizes:
+        records = repeated_records(source, size)
+
+        started = time.perf_counter()
+        index = build_search_index(records)
+        data = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        seconds = time.perf_counter() - started
+
+        compressed = gzip.compress(data, mtime=0)
+        records_size = len(json.dumps(records).encode("utf-8"))
+        print(
+            f"{size:>8} {seconds:>8.2f} {len(index['terms']):>8}"
+            f" {len(data) / 1024:>9.0f} {len(compressed) / 1024:>8.0f}"
+            f" {len(compressed) / size:>9.0f} {records_size / 1024:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
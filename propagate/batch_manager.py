@@ -1,49 +1,88 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
 import os
 from pathlib import Path
+from typing import Callable, Iterator
 
-import requests
-from propagate.build import build_from_claude_batch
+from propagate.build import build_from_batch_results
+from propagate.config import DB_PATH
+from propagate.db import PropagateDB
 from propagate.logging_config import get_logger, setup_logging
+from propagate.models import ExecutiveOrder
+from propagate.summarize_eo import BatchJob, parse_custom_id
 from propagate.util import get_client
 
 logger = get_logger(__name__)
 
+# applied results are written to the ledger in groups of this size
+LEDGER_FLUSH_SIZE = 100
 
-def list_batches(limit: int = 20):
-    """List recent batches from Anthropic API."""
-    client = get_client()
 
-    response = client.messages.batches.list(limit=limit)
+def record_batch_job(
+    db: PropagateDB, job: BatchJob, president_key: str, run_id: int | None = None
+):
+    """Add every batch of a submitted job and its requests to the ledger."""
+    for batch_id, request_ids in job.request_ids.items():
+        db.record_batch(
+            batch_id,
+            president_key,
+            [(uid, parse_custom_id(uid)[1]) for uid in request_ids],
+            run_id=run_id,
+            response_keys=job.response_keys,
+        )
+
+
+def _update_ledger(db: PropagateDB, batch) -> None:
+    db.update_batch(
+        batch.id,
+        None,
+        batch.processing_status,
+        submitted_at=batch.created_at.isoformat(),
+        ended_at=batch.ended_at.isoformat() if batch.ended_at else None,
+    )
+
+
+def list_batches(limit: int = 20, refresh: bool = False, db: PropagateDB | None = None):
+    """
+    List recent batches from the local ledger.
+
+    With `refresh`, the status of batches that have not ended is fetched
+    from the API first.
+    """
+    db = db or PropagateDB(DB_PATH)
+
+    if refresh:
+        client = get_client()
+        for row in db.get_batches(limit):
+            if row["status"] != "ended":
+                _update_ledger(db, client.messages.batches.retrieve(row["batch_id"]))
+
+    rows = db.get_batches(limit)
+    if not rows:
+        logger.info("No batches recorded yet")
+        return
 
     logger.info("Recent batches (showing up to %d)", limit)
-    for batch in response.data:
-        total = (
-            batch.request_counts.processing
-            + batch.request_counts.succeeded
-            + batch.request_counts.errored
-            + batch.request_counts.canceled
-            + batch.request_counts.expired
-        )
+    for row in rows:
         logger.info(
-            "Batch %s status=%s created=%s total=%d succeeded=%d processing=%d",
-            batch.id, batch.processing_status, batch.created_at,
-            total, batch.request_counts.succeeded, batch.request_counts.processing,
+            "Batch %s president=%s status=%s submitted=%s requests=%d"
+            " succeeded=%d failed=%d processed=%s",
+            row["batch_id"], row["president"] or "unknown", row["status"],
+            row["submitted_at"], row["request_count"], row["succeeded"],
+            row["failed"], row["processed_at"] or "no",
         )
-        if batch.request_counts.errored > 0:
-            logger.error("Batch %s errored=%d", batch.id, batch.request_counts.errored)
-        if hasattr(batch, "results_url") and batch.results_url:
-            logger.info("Batch %s results available for download", batch.id)
 
 
-def get_batch_status(batch_id: str):
-    """Get status of a specific batch."""
+def get_batch_status(batch_id: str, db: PropagateDB | None = None):
+    """Get status of a specific batch and record it in the ledger."""
     client = get_client()
+    db = db or PropagateDB(DB_PATH)
 
     try:
         batch = client.messages.batches.retrieve(batch_id)
+        _update_ledger(db, batch)
         total = (
             batch.request_counts.processing
             + batch.request_counts.succeeded
@@ -68,8 +107,30 @@ def get_batch_status(batch_id: str):
         logger.error("Error retrieving batch: %s", e)
 
 
-def download_and_process_batch(batch_id: str):
-    """Download batch results and process them."""
+def download_and_process_batch(
+    batch_id: str,
+    on_usage: Callable[[ExecutiveOrder, dict], None] | None = None,
+    db: PropagateDB | None = None,
+) -> list[str] | None:
+    """
+    Download batch results and process them.
+
+    Every applied result is recorded in the ledger, so processing is
+    idempotent: a processed batch is not downloaded again, and an
+    interrupted one resumes by skipping the results it already applied.
+
+    Returns the custom IDs that failed, or None when the results could not
+    be downloaded.
+    """
+    db = db or PropagateDB(DB_PATH)
+
+    ledger = db.get_batch(batch_id)
+    if ledger and ledger["processed_at"]:
+        logger.info(
+            "Batch %s was already processed at %s", batch_id, ledger["processed_at"]
+        )
+        return _failed_request_ids(db, batch_id)
+
     client = get_client()
 
     # Get batch info
@@ -77,38 +138,88 @@ def download_and_process_batch(batch_id: str):
         batch = client.messages.batches.retrieve(batch_id)
     except Exception as e:
         logger.error("Error retrieving batch %s: %s", batch_id, e)
-        return
+        return None
+
+    _update_ledger(db, batch)
 
     if batch.processing_status != "ended":
         logger.error("Batch is not complete. Status: %s", batch.processing_status)
-        return
+        return None
 
     if not hasattr(batch, "results_url") or not batch.results_url:
         logger.error("No results URL available for batch %s", batch_id)
-        return
+        return None
 
     output_dir = Path("batch_results")
     output_dir.mkdir(exist_ok=True)
     output_file = output_dir / f"batch_{batch_id}.jsonl"
 
-    logger.info("Downloading batch results...")
-    response = requests.get(
-        batch.results_url,
-        headers={
-            "anthropic-version": "2023-06-01",
-            "x-api-key": os.getenv("PROPAGATE_ANTHROPIC_API_KEY"),
-        },
-    )
-    response.raise_for_status()
+    requests = db.get_batch_requests(batch_id)
+    applied = {r["custom_id"] for r in requests if r["processed_at"]}
+    response_keys = {
+        r["custom_id"]: r["response_key"] for r in requests if r["response_key"]
+    }
+    if applied:
+        logger.info(
+            "Resuming batch %s, %d results already applied", batch_id, len(applied)
+        )
+
+    outcomes: list[tuple[str, int, str, str]] = []
+
+    def on_result(custom_id: str, outcome: str):
+        president_key, eo_number = parse_custom_id(custom_id)
+        outcomes.append((custom_id, eo_number, president_key, outcome))
+        if len(outcomes) >= LEDGER_FLUSH_SIZE:
+            db.record_batch_results(batch_id, outcomes)
+            outcomes.clear()
 
-    with open(output_file, "wb") as f:
-        f.write(response.content)
+    logger.info("Downloading and processing batch results...")
+    entries = (
+        entry
+        for entry in _iter_batch_results(client, batch_id, output_file)
+        if entry["custom_id"] not in applied
+    )
+    try:
+        build_from_batch_results(
+            entries,
+            on_usage=on_usage,
+            db=db,
+            on_result=on_result,
+            response_keys=response_keys,
+        )
+    finally:
+        if outcomes:
+            db.record_batch_results(batch_id, outcomes)
+    db.finish_batch(batch_id)
 
+    failed = _failed_request_ids(db, batch_id)
     logger.info("Downloaded to %s", output_file)
+    logger.info("Batch processing complete, %d failed", len(failed))
+    return failed
 
-    logger.info("Processing batch results...")
-    build_from_claude_batch(output_file)
-    logger.info("Batch processing complete")
+
+def _failed_request_ids(db: PropagateDB, batch_id: str) -> list[str]:
+    return [
+        r["custom_id"]
+        for r in db.get_batch_requests(batch_id)
+        if r["result"] != "succeeded"
+    ]
+
+
+def _iter_batch_results(client, batch_id: str, output_file: Path) -> Iterator[dict]:
+    """
+    Stream a batch's results, yielding each one as soon as its line arrives.
+
+    Every line is also appended to `output_file`, which is moved into place
+    only once the whole download has been read.
+    """
+    part_file = output_file.with_name(output_file.name + ".part")
+    with open(part_file, "w") as f:
+        for result in client.messages.batches.results(batch_id):
+            entry = result.model_dump(mode="json")
+            f.write(json.dumps(entry) + "\n")
+            yield entry
+    os.replace(part_file, output_file)
 
 
 def main():
@@ -121,6 +232,11 @@ def main():
     list_parser.add_argument(
         "--limit", type=int, default=20, help="Number of batches to show"
     )
+    list_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Fetch the status of unfinished batches from the API first",
+    )
 
     # Status command
     status_parser = subparsers.add_parser("status", help="Get batch status")
@@ -133,7 +249,7 @@ def main():
     args = parser.parse_args()
 
     if args.command == "list":
-        list_batches(args.limit)
+        list_batches(args.limit, refresh=args.refresh)
     elif args.command == "status":
         get_batch_status(args.batch_id)
     elif args.command == "process":
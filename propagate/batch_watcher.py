@@ -0,0 +1,126 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+
+from propagate.config import POLL_BACKOFF, POLL_MAX_INTERVAL, POLL_MIN_INTERVAL
+from propagate.logging_config import get_logger
+from propagate.util import get_client
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _BatchState:
+    last_polled: float | None = None
+    done: int | None = None
+    rate: float | None = None  # requests finished per second
+    eta: float | None = None
+
+
+class BatchWatcher:
+    """
+    Poll several message batches until each has ended.
+
+    Polling starts every `min_interval` seconds and backs off by `backoff`
+    up to `max_interval`. Between polls, the change in a batch's
+    request_counts gives its completion rate. The next poll is never
+    scheduled later than the earliest estimated completion, so an ended
+    batch is picked up soon after it ends rather than a full interval
+    later.
+    """
+
+    def __init__(
+        self,
+        batch_ids: list[str],
+        timeout: float,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+        backoff: float = POLL_BACKOFF,
+    ):
+        self.batch_ids = list(batch_ids)
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.polls = 0
+        self.elapsed = 0.0
+        # longest delay between a batch ending and the watcher noticing
+        self.detect_seconds = 0.0
+        self._states: dict[str, _BatchState] = {}
+
+    def watch(self) -> Iterator[str]:
+        """
+        Yield each batch ID as soon as its batch has ended.
+
+        Raises TimeoutError when batches are still pending after `timeout`
+        seconds.
+        """
+        started = time.monotonic()
+        pending = list(self.batch_ids)
+        interval = self.min_interval
+
+        while pending:
+            for batch_id in list(pending):
+                if self._poll(batch_id):
+                    pending.remove(batch_id)
+                    self.elapsed = time.monotonic() - started
+                    suspended = time.monotonic()
+                    yield batch_id
+                    # time spent processing results is not waiting time
+                    started += time.monotonic() - suspended
+            self.elapsed = time.monotonic() - started
+
+            if not pending:
+                break
+            if self.elapsed >= self.timeout:
+                raise TimeoutError(
+                    f"Batch {','.join(pending)} did not complete"
+                    f" within {int(self.timeout)}s"
+                )
+
+            etas = [
+                self._states[b].eta for b in pending
+                if self._states[b].eta is not None
+            ]
+            delay = interval
+            if etas:
+                delay = min(delay, max(self.min_interval, min(etas)))
+            delay = min(delay, self.timeout - self.elapsed)
+            time.sleep(max(delay, 0))
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def _poll(self, batch_id: str) -> bool:
+        batch = get_client().messages.batches.retrieve(batch_id)
+        now = time.monotonic()
+        self.polls += 1
+        state = self._states.setdefault(batch_id, _BatchState())
+
+        counts = batch.request_counts
+        done = counts.succeeded + counts.errored + counts.canceled + counts.expired
+        if state.done is not None and now > state.last_polled:
+            rate = (done - state.done) / (now - state.last_polled)
+            if rate > 0:
+                state.rate = rate
+        state.eta = counts.processing / state.rate if state.rate else None
+
+        logger.info(
+            "Batch %s poll=%d status=%s done=%d/%d eta=%s",
+            batch_id, self.polls, batch.processing_status, done,
+            done + counts.processing,
+            f"{state.eta:.0f}s" if state.eta is not None else "unknown",
+        )
+
+        previous_poll = state.last_polled
+        state.done, state.last_polled = done, now
+
+        if batch.processing_status != "ended":
+            return False
+
+        if batch.ended_at is not None:
+            detect = (datetime.now(timezone.utc) - batch.ended_at).total_seconds()
+        else:
+            # ended some time after the previous poll
+            detect = now - previous_poll if previous_poll is not None else 0.0
+        self.detect_seconds = max(self.detect_seconds, detect, 0.0)
+        return True
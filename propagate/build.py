@@ -1,15 +1,27 @@
+import hashlib
 import json
 import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterable, Mapping
 
-from propagate.federalregister import fetch_eo_metadata
+from propagate.config import BUILD_WORKERS, DB_PATH, WEB_DATA_DIR
+from propagate.db import PropagateDB
+from propagate.federalregister import sync_eo_metadata
 from propagate.logging_config import get_logger
+from propagate.models import PRESIDENTS, ExecutiveOrder
+from propagate.response_cache import cache_response, evict_responses
+from propagate.summarize_eo import parse_custom_id
 from propagate.util import (
     claude_json_to_summary,
     save_summary,
 )
+from propagate.webdata import compress_file, write_web_data
 
 logger = get_logger(__name__)
 
@@ -22,112 +34,361 @@ class DateTimeEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-def build_from_claude_batch(jsonl_path: Path):
+def build_from_claude_batch(
+    jsonl_path: Path,
+    on_usage: Callable[[ExecutiveOrder, dict], None] | None = None,
+    db: PropagateDB | None = None,
+) -> list[str]:
     """
     Build from a Claude batch.
 
     This will read from the jsonl_path.
 
-    It will then save the summaries to a file.
-    """
-    eos = fetch_eo_metadata()
+    It will then save the summaries to a file. `on_usage` is called with the
+    token usage of every succeeded result.
 
+    Returns the custom IDs of results that did not produce a summary:
+    errored, expired and canceled requests and unparseable responses.
+    """
     with open(jsonl_path, "r") as f:
-        for line in f:
-            entry = json.loads(line)
-            parts = entry["custom_id"].split("-")
-            # format: eo-{president_key...}-{eo_number}-{uuid8}
-            eo_number = int(parts[-2])
+        return build_from_batch_results(
+            (json.loads(line) for line in f), on_usage, db
+        )
+
+
+def load_president_orders(
+    president_key: str, db: PropagateDB, refresh: bool = False
+) -> list[ExecutiveOrder]:
+    """
+    EO metadata for one president, from the local catalog when it has any.
+
+    The catalog is synced from the Federal Register first when it is empty
+    or `refresh` is set, e.g. because it lacks an EO that has results.
+    """
+    catalog = db.get_catalog(president_key)
+    if catalog and not refresh:
+        orders = [ExecutiveOrder.from_dict(data) for data in catalog]
+    else:
+        logger.info("Syncing metadata catalog for %s", president_key)
+        orders = sync_eo_metadata(db, president=president_key)
+
+    names = {p.key: p.name for p in PRESIDENTS}
+    for order in orders:
+        order.president = names.get(president_key, order.president)
+    return orders
+
+
+def _save_result(
+    order: ExecutiveOrder, text: str, cache_key: str | None = None
+) -> str | None:
+    """
+    Parse one succeeded result and write its -claude.json and summary files.
+
+    Runs in a worker process when results are post-processed in parallel,
+    so it only takes and returns picklable values and does no network or
+    database work. The response is cached under `cache_key` when the
+    request's key is known. Returns an error message when the response
+    cannot be turned into a summary.
+    """
+    try:
+        claude_json = json.loads(text)
+        summary = claude_json_to_summary(claude_json, order)
+    except Exception as ex:
+        return str(ex)
+
+    # remember the response so a forced rebuild can skip the API
+    if cache_key is not None:
+        cache_response(cache_key, claude_json)
+
+    # write to a file in the summaries directory
+    with open(
+        Path(os.getenv("PROPAGATE_SUMMARIES_DIR"))
+        / f"EO-{order.executive_order_number}-claude.json",
+        "w",
+    ) as f:
+        json.dump(claude_json, f, cls=DateTimeEncoder)
+
+    summary_path = order.get_summary_path()
+
+    # Save summary
+    saved_path = save_summary(summary, summary_path)
+    logger.info("Summary saved to %s", saved_path)
+    return None
+
+
+ResultCallback = Callable[[str, str], None]
+
+
+def build_from_batch_results(
+    entries: Iterable[dict],
+    on_usage: Callable[[ExecutiveOrder, dict], None] | None = None,
+    db: PropagateDB | None = None,
+    workers: int = BUILD_WORKERS,
+    on_result: ResultCallback | None = None,
+    response_keys: Mapping[str, str] | None = None,
+) -> list[str]:
+    """
+    Save a summary for each batch result as it is read from `entries`.
+
+    `entries` may be a lazy stream, so summaries are written while the
+    results are still downloading. Orders are looked up by the president
+    and EO number in each custom ID; a president's metadata is loaded the
+    first time one of their results appears, and synced once more if a
+    result's EO is missing from it. See build_from_claude_batch.
+
+    With `workers` above 1, decoding, conversion and file writes run in a
+    process pool with at most `workers * 2` results in flight. Every result
+    writes only its own files, so the output is the same either way, and
+    failed IDs are returned in input order.
+
+    `on_result` is called with each custom ID and its outcome once the
+    result has been applied: "succeeded", the batch result type for
+    errored, expired and canceled requests, "unknown_eo" or "unparseable".
+
+    `response_keys` maps custom IDs to the response cache keys recorded when
+    the requests were submitted; results without one are not cached.
+    """
+    response_keys = response_keys or {}
+    db = db or PropagateDB(DB_PATH)
+    index: dict[tuple[str, int], ExecutiveOrder] = {}
+    loaded: set[str] = set()
+    refreshed: set[str] = set()
+    failed: list[tuple[int, str]] = []
+    pending: dict[Future, tuple[int, str, int]] = {}
+
+    def report(position: int, custom_id: str, outcome: str):
+        if outcome != "succeeded":
+            failed.append((position, custom_id))
+        if on_result is not None:
+            on_result(custom_id, outcome)
+
+    def save_outcome(eo_number: int, error: str | None) -> str:
+        if error is None:
+            return "succeeded"
+        logger.error("%d: %s", eo_number, error)
+        return "unparseable"
+
+    def collect(futures):
+        for future in futures:
+            position, custom_id, eo_number = pending.pop(future)
+            try:
+                error = future.result()
+            except Exception as ex:
+                error = str(ex)
+            report(position, custom_id, save_outcome(eo_number, error))
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    with executor or nullcontext():
+        for position, entry in enumerate(entries):
+            custom_id = entry["custom_id"]
+            president_key, eo_number = parse_custom_id(custom_id)
             result = entry["result"]
             if result["type"] != "succeeded":
-                logger.error("Skipping %d: %s - %s", eo_number, result["type"], result.get("error", ""))
+                logger.error(
+                    "Skipping %d: %s - %s",
+                    eo_number, result["type"], result.get("error", ""),
+                )
+                report(position, custom_id, result["type"])
                 continue
 
+            if president_key not in loaded:
+                if not db.get_catalog(president_key):
+                    # synced just now, so there is nothing newer to refresh
+                    refreshed.add(president_key)
+                for order in load_president_orders(president_key, db):
+                    index[(president_key, order.executive_order_number)] = order
+                loaded.add(president_key)
+
+            order = index.get((president_key, eo_number))
+            if order is None and president_key not in refreshed:
+                # published after the catalog was last synced
+                for order in load_president_orders(president_key, db, refresh=True):
+                    index[(president_key, order.executive_order_number)] = order
+                refreshed.add(president_key)
+                order = index.get((president_key, eo_number))
+            if order is None:
+                logger.error("No metadata for EO %d of %s", eo_number, president_key)
+                report(position, custom_id, "unknown_eo")
+                continue
+
+            if on_usage is not None:
+                on_usage(order, result["message"]["usage"])
+
             text = result["message"]["content"][0]["text"]
 
-            try:
-                claude_json = json.loads(text)
-            except Exception as ex:
-                logger.error("%d: %s", eo_number, ex)
+            cache_key = response_keys.get(custom_id)
+            if executor is None:
+                error = _save_result(order, text, cache_key)
+                report(position, custom_id, save_outcome(eo_number, error))
                 continue
 
-            # write to a file in the summaries directory
-            with open(
-                Path(os.getenv("PROPAGATE_SUMMARIES_DIR"))
-                / f"EO-{eo_number}-claude.json",
-                "w",
-            ) as f:
-                json.dump(claude_json, f, cls=DateTimeEncoder)
+            future = executor.submit(_save_result, order, text, cache_key)
+            pending[future] = (position, custom_id, eo_number)
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
 
-            order = [eo for eo in eos if eo.executive_order_number == eo_number][0]
-            summary = claude_json_to_summary(claude_json, order)
-            summary_path = order.get_summary_path()
+        collect(list(pending))
 
-            # Save summary
-            saved_path = save_summary(summary, summary_path)
-            logger.info("Summary saved to %s", saved_path)
+    evict_responses()
+    return [custom_id for _, custom_id in sorted(failed)]
 
 
-def build_from_summaries():
-    eo_dir = Path(os.getenv("PROPAGATE_SUMMARIES_DIR"))
-    eo_files = list(eo_dir.glob("*.json"))
-    eo_data = []
+NO_EXPIRATION_DATE_STRINGS = [
+    "No expiration date specified",
+    "Not specified",
+    "No expiration date is stated",
+]
+
+
+# The same few date strings repeat across thousands of summaries, so each
+# distinct one is only parsed once per process.
+@lru_cache(maxsize=4096)
+def _normalize_effective_date(value: str) -> str:
+    if "12:01" in value:
+        # drop the time of day, e.g. "January 20, 2025, at 12:01 a.m. EST"
+        splits = value.split(",")
+        value = splits[0].strip() + ", " + splits[1].strip()
+    try:
+        return datetime.strptime(value, "%B %d, %Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return value
+
+
+@lru_cache(maxsize=4096)
+def _normalize_expiration_date(value: str) -> str:
+    if any(s in value for s in NO_EXPIRATION_DATE_STRINGS):
+        return "No expiration date stated"
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return value
+
+
+@lru_cache(maxsize=4096)
+def _normalize_signing_date(value: str) -> str:
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+# bump whenever normalize_summary's output changes, so records already in the
+# summary manifest are re-parsed
+NORMALIZER_VERSION = 1
+
+
+def normalize_summary(eo: dict, mtime: float) -> dict:
+    """
+    Turn a summary file's JSON into its eo.json record.
+
+    Dates are re-emitted as YYYY-MM-DD where they can be parsed, and the
+    file's modification time becomes the record's timestamp.
+    """
+    if "effective_date" in eo:
+        eo["effective_date"] = _normalize_effective_date(eo["effective_date"])
+    eo["expiration_date"] = _normalize_expiration_date(eo["expiration_date"])
+    eo["signing_date"] = _normalize_signing_date(eo["signing_date"])
+    eo["timestamp"] = datetime.fromtimestamp(float(mtime)).strftime("%Y-%m-%d")
+    return eo
+
+
+def sync_summary_manifest(db: PropagateDB, eo_dir: Path):
+    """
+    Bring the summary manifest in `db` up to date with `eo_dir`.
+
+    Only files whose mtime or size changed are read. A file whose content
+    hash is unchanged only has its mtime and timestamp refreshed; anything
+    else is re-parsed and its normalized record replaced. Records built by
+    another NORMALIZER_VERSION are re-parsed whether or not their file
+    changed. Records of deleted files are removed.
+    """
+    manifest = {entry["path"]: entry for entry in db.get_summary_manifest()}
+    seen = set()
+    changed = []
+    touched = []
 
     # ignore eo.json
-    for file in eo_files:
+    for file in eo_dir.glob("*.json"):
         if file.name == "eo.json" or "claude" in file.name:
             continue
 
-        with open(file, "r") as f:
-            obj = json.load(f)
-            obj["timestamp"] = file.stat().st_mtime
-            eo_data.append(obj)
-
-    # convert these to date objects
-    # effective_date, signing_date
-    for eo in eo_data:
-        try:
-            if "12:01" in eo["effective_date"]:
-                splits = eo["effective_date"].split(",")
-                eo["effective_date"] = splits[0].strip() + ", " + splits[1].strip()
-                eo["effective_date"] = datetime.strptime(
-                    eo["effective_date"], "%B %d, %Y"
-                )
-            else:
-                eo["effective_date"] = datetime.strptime(
-                    eo["effective_date"], "%B %d, %Y"
-                )
-        except (ValueError, KeyError):
-            pass
+        path = file.as_posix()
+        seen.add(path)
+        stat = file.stat()
+        entry = manifest.get(path)
+        if entry and entry["normalizer_version"] != NORMALIZER_VERSION:
+            entry = None
+        if entry and (entry["mtime"], entry["size"]) == (stat.st_mtime, stat.st_size):
+            continue
+
+        data = file.read_bytes()
+        sha256 = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == sha256:
+            touched.append((path, stat.st_mtime))
+            continue
+
+        record = normalize_summary(json.loads(data), stat.st_mtime)
+        changed.append((path, stat.st_mtime, stat.st_size, sha256, record))
+
+    deleted = [path for path in manifest if path not in seen]
 
-        no_specified_date_strings = [
-            "No expiration date specified",
-            "Not specified",
-            "No expiration date is stated",
+    db.upsert_summary_manifest(changed, NORMALIZER_VERSION)
+    db.touch_summary_manifest(
+        [
+            (path, mtime, datetime.fromtimestamp(mtime).strftime("%Y-%m-%d"))
+            for path, mtime in touched
         ]
+    )
+    db.delete_summary_manifest(deleted)
+    logger.info(
+        "Summary manifest: %d added or changed, %d touched, %d deleted, %d total",
+        len(changed), len(touched), len(deleted), len(seen),
+    )
 
-        # find one of these strings in expiration_date
-        if any(s in eo["expiration_date"] for s in no_specified_date_strings):
-            eo["expiration_date"] = "No expiration date stated"
-        else:
-            try:
-                eo["expiration_date"] = datetime.strptime(
-                    eo["expiration_date"], "%Y-%m-%d"
-                )
-            except (ValueError, KeyError):
-                pass
 
-        eo["signing_date"] = datetime.strptime(eo["signing_date"], "%Y-%m-%d")
-        # timestamp is a float in seconds since epoch
-        eo["timestamp"] = datetime.fromtimestamp(float(eo["timestamp"]))
+def write_eo_json(records: Iterable[dict], path: Path, build_time: str) -> int:
+    """
+    Write `records` to `path` as {"eos": [...], "build_time": ...}.
+
+    Records are serialized one at a time as they are read, and the file is
+    replaced only once it is complete. Returns the number of records.
+    """
+    count = 0
+    part = path.with_name(path.name + ".part")
+    with open(part, "w") as f:
+        f.write('{"eos": [')
+        for record in records:
+            if count:
+                f.write(", ")
+            f.write(json.dumps(record))
+            count += 1
+        f.write(f'], "build_time": {json.dumps(build_time)}}}')
+    os.replace(part, path)
+    return count
+
 
-    # order by executive order number descending
-    eo_data.sort(key=lambda x: x["eo_number"], reverse=True)
+def build_from_summaries(db: PropagateDB | None = None):
+    """
+    Write eo/eo.json from the summaries in PROPAGATE_SUMMARIES_DIR.
+
+    Normalized records are kept in a manifest in `db`, so a build only
+    re-reads the summary files that were added or changed since the last
+    one. Records are streamed from the manifest, highest EO number first.
+    """
+    db = db or PropagateDB(DB_PATH)
+    eo_dir = Path(os.getenv("PROPAGATE_SUMMARIES_DIR"))
+    sync_summary_manifest(db, eo_dir)
 
-    eo_json = {"eos": eo_data, "build_time": datetime.now().isoformat()}
+    build_time = datetime.now().isoformat()
+    started = time.monotonic()
+    count = write_eo_json(db.iter_summary_records(), Path("eo/eo.json"), build_time)
+    elapsed = time.monotonic() - started
+    compress_file(Path("eo/eo.json"))
+    logger.info(
+        "Wrote %d records to eo/eo.json in %.2fs (%.0f records/s)",
+        count, elapsed, count / elapsed if elapsed else 0,
+    )
 
-    with open("eo/eo.json", "w") as f:
-        json.dump(eo_json, f, cls=DateTimeEncoder)
+    write_web_data(db.iter_summary_records(), WEB_DATA_DIR, build_time)
 
 
 if __name__ == "__main__":
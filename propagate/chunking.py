@@ -0,0 +1,121 @@
+import base64
+import io
+from dataclasses import dataclass
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from propagate.config import CHUNK_MAX_PAGES, MAX_REQUEST_BYTES
+from propagate.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# room for the system prompt, the instructions and the JSON envelope
+REQUEST_HEADROOM_BYTES = 512 * 1024
+MAX_DOCUMENT_BYTES = MAX_REQUEST_BYTES - REQUEST_HEADROOM_BYTES
+# largest PDF whose base64 encoding fits in MAX_DOCUMENT_BYTES
+MAX_CHUNK_BYTES = MAX_DOCUMENT_BYTES * 3 // 4
+
+
+@dataclass
+class PdfChunk:
+    """A page range of a PDF, written out as a PDF of its own."""
+
+    start_page: int  # 1-based, inclusive
+    end_page: int
+    page_count: int  # pages in the whole document
+    data: bytes
+
+
+def is_oversized(document: dict, pdf_path: str | Path | None = None) -> bool:
+    """
+    Whether a document is too large to send in one request: its inline data
+    is over MAX_DOCUMENT_BYTES, or it is a PDF of more than CHUNK_MAX_PAGES
+    pages.
+
+    Pages are counted in `pdf_path` when given, which is the only way to
+    count them for a Files API reference, and otherwise in the inline data.
+    """
+    source = document["source"]
+    if len(source.get("data", "")) > MAX_DOCUMENT_BYTES:
+        return True
+    if source["type"] != "file" and source.get("media_type") != "application/pdf":
+        return False
+
+    try:
+        if pdf_path is not None:
+            reader = PdfReader(pdf_path)
+        elif source["type"] == "base64":
+            reader = PdfReader(io.BytesIO(base64.b64decode(source["data"])))
+        else:
+            return False
+        return len(reader.pages) > CHUNK_MAX_PAGES
+    except (OSError, PdfReadError) as e:
+        # let the API decide on a PDF that cannot be read here
+        logger.warning("Could not count the pages of %s: %s", pdf_path or "PDF", e)
+        return False
+
+
+def _write_pages(reader: PdfReader, start: int, end: int) -> bytes:
+    writer = PdfWriter()
+    for index in range(start, end):
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def split_pdf(
+    pdf_path: Path,
+    max_bytes: int = MAX_CHUNK_BYTES,
+    max_pages: int = CHUNK_MAX_PAGES,
+) -> list[PdfChunk]:
+    """
+    Split a PDF into consecutive page ranges of at most `max_bytes` and
+    `max_pages` each.
+
+    The first cut assumes pages are of similar size. Any range that still
+    comes out too large is halved until it fits, so pages with large images
+    end up in smaller ranges. Raises ValueError when a single page is over
+    `max_bytes`.
+    """
+    reader = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    file_size = pdf_path.stat().st_size
+
+    step = max(1, min(max_pages, page_count * max_bytes // max(file_size, 1)))
+    ranges = [
+        (start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+
+    chunks = []
+    # ranges are popped from the end, so keep them in reverse order
+    ranges.reverse()
+    while ranges:
+        start, end = ranges.pop()
+        data = _write_pages(reader, start, end)
+        if len(data) <= max_bytes:
+            chunks.append(PdfChunk(start + 1, end, page_count, data))
+            continue
+        if end - start == 1:
+            raise ValueError(
+                f"Page {start + 1} of {pdf_path} is larger than {max_bytes} bytes"
+            )
+        middle = (start + end) // 2
+        ranges.extend([(middle, end), (start, middle)])
+
+    logger.info("Split %s into %d page ranges", pdf_path, len(chunks))
+    return chunks
+
+
+def chunk_document(chunk: PdfChunk) -> dict:
+    return {
+        "type": "document",
+        "source": {
+            "type": "base64",
+            "media_type": "application/pdf",
+            "data": base64.standard_b64encode(chunk.data).decode("utf-8"),
+        },
+        "title": f"Pages {chunk.start_page}-{chunk.end_page} of {chunk.page_count}",
+    }
@@ -5,5 +5,53 @@ MODEL: str | None = os.environ.get("PROPAGATE_MODEL")
 PDF_DIR: Path = Path(os.environ.get("PROPAGATE_PDF_DIR"))
 SUMMARIES_DIR: Path = Path(os.environ.get("PROPAGATE_SUMMARIES_DIR"))
 CLAUDE_API_KEY: str | None = os.environ.get("PROPAGATE_ANTHROPIC_API_KEY")
+ANTHROPIC_BASE_URL: str | None = os.environ.get("PROPAGATE_ANTHROPIC_BASE_URL")
+DB_PATH: Path = Path(os.environ.get("PROPAGATE_DB_PATH", "propagate.db"))
+# slim index and per-president/year detail shards loaded by the web frontend
+WEB_DATA_DIR: Path = Path(os.environ.get("PROPAGATE_WEB_DATA_DIR", "eo/web"))
 MAX_SUMMARY_LENGTH: int = 250
 MAX_TOKENS: int = 16000
+# Messages API limits are 32 MB per request and 100 pages per PDF; larger PDFs
+# are split into page ranges and summarized in chunks
+MAX_REQUEST_BYTES: int = 32 * 1024 * 1024
+CHUNK_MAX_PAGES: int = int(os.environ.get("PROPAGATE_CHUNK_MAX_PAGES", "100"))
+DOWNLOAD_WORKERS: int = int(os.environ.get("PROPAGATE_DOWNLOAD_WORKERS", "8"))
+DOWNLOADS_PER_HOST: int = int(os.environ.get("PROPAGATE_DOWNLOADS_PER_HOST", "4"))
+HTTP_CACHE_DIR: Path = Path(os.environ.get("PROPAGATE_HTTP_CACHE_DIR", ".http_cache"))
+HTTP_POOL_SIZE: int = int(os.environ.get("PROPAGATE_HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES: int = int(os.environ.get("PROPAGATE_HTTP_RETRIES", "5"))
+HTTP_BACKOFF: float = float(os.environ.get("PROPAGATE_HTTP_BACKOFF", "0.5"))
+HTTP_TIMEOUT: float = float(os.environ.get("PROPAGATE_HTTP_TIMEOUT", "60"))
+SUMMARY_WORKERS: int = int(os.environ.get("PROPAGATE_SUMMARY_WORKERS", "4"))
+# processes used to post-process batch results; 1 processes them inline
+BUILD_WORKERS: int = int(os.environ.get("PROPAGATE_BUILD_WORKERS", "1"))
+SUMMARY_MAX_ATTEMPTS: int = int(os.environ.get("PROPAGATE_SUMMARY_MAX_ATTEMPTS", "5"))
+# Message Batches API limits are 100,000 requests and 256 MB per batch
+BATCH_MAX_REQUESTS: int = int(os.environ.get("PROPAGATE_BATCH_MAX_REQUESTS", "100000"))
+BATCH_MAX_BYTES: int = int(
+    os.environ.get("PROPAGATE_BATCH_MAX_BYTES", str(250 * 1024 * 1024))
+)
+BATCH_SPOOL_DIR: Path = Path(
+    os.environ.get("PROPAGATE_BATCH_SPOOL_DIR", "batch_results/spool")
+)
+# batch polling starts at the minimum interval and backs off to the maximum
+POLL_MIN_INTERVAL: float = float(os.environ.get("PROPAGATE_POLL_MIN_INTERVAL", "5"))
+POLL_MAX_INTERVAL: float = float(os.environ.get("PROPAGATE_POLL_MAX_INTERVAL", "120"))
+POLL_BACKOFF: float = float(os.environ.get("PROPAGATE_POLL_BACKOFF", "1.5"))
+# batches submitted per run, counting resubmissions of failed requests
+BATCH_MAX_ATTEMPTS: int = int(os.environ.get("PROPAGATE_BATCH_MAX_ATTEMPTS", "3"))
+# stream sync responses and record time to first token and tokens per second
+STREAMING: bool = os.environ.get("PROPAGATE_STREAMING", "") in ("1", "true")
+PROMPT_CACHING: bool = os.environ.get("PROPAGATE_PROMPT_CACHING", "") in ("1", "true")
+RESPONSE_CACHE: bool = os.environ.get("PROPAGATE_RESPONSE_CACHE", "1") in ("1", "true")
+RESPONSE_CACHE_DIR: Path = Path(
+    os.environ.get("PROPAGATE_RESPONSE_CACHE_DIR", ".response_cache")
+)
+RESPONSE_CACHE_MAX_ENTRIES: int = int(
+    os.environ.get("PROPAGATE_RESPONSE_CACHE_MAX_ENTRIES", "20000")
+)
+# "pdf" sends the base64 PDF; "text" sends the Federal Register XML/HTML body
+# as plain text and falls back to the PDF when no text is available; "file"
+# uploads each PDF once through the Files API and references it by file ID
+SOURCE_MODE: str = os.environ.get("PROPAGATE_SOURCE_MODE", "pdf")
+TEXT_DIR: Path = Path(os.environ.get("PROPAGATE_TEXT_DIR", PDF_DIR.parent / "text"))
@@ -1,6 +1,8 @@
+import json
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator, Mapping
 
 
 class PropagateDB:
@@ -20,6 +22,8 @@ class PropagateDB:
                 eos_new INTEGER,
                 batch_id TEXT,
                 poll_seconds INTEGER,
+                poll_count INTEGER,
+                detect_seconds REAL,
                 status TEXT NOT NULL DEFAULT 'running',
                 error TEXT,
                 deployed INTEGER DEFAULT 0
@@ -32,10 +36,100 @@ class PropagateDB:
                 status TEXT NOT NULL,
                 processed_at TEXT NOT NULL
             );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                president TEXT PRIMARY KEY,
+                last_publication_date TEXT NOT NULL,
+                document_numbers TEXT NOT NULL,
+                synced_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS eo_catalog (
+                president TEXT NOT NULL,
+                document_number TEXT NOT NULL,
+                eo_number INTEGER,
+                publication_date TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (president, document_number)
+            );
+            CREATE TABLE IF NOT EXISTS token_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                eo_number INTEGER NOT NULL,
+                president TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_creation_input_tokens INTEGER NOT NULL DEFAULT 0,
+                cache_read_input_tokens INTEGER NOT NULL DEFAULT 0,
+                time_to_first_token REAL,
+                tokens_per_second REAL,
+                recorded_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                president TEXT,
+                run_id INTEGER REFERENCES runs(id),
+                status TEXT NOT NULL,
+                request_count INTEGER NOT NULL DEFAULT 0,
+                submitted_at TEXT,
+                ended_at TEXT,
+                processed_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS batch_requests (
+                custom_id TEXT PRIMARY KEY,
+                batch_id TEXT NOT NULL REFERENCES batches(batch_id),
+                eo_number INTEGER NOT NULL,
+                president TEXT NOT NULL,
+                submitted_at TEXT,
+                result TEXT,
+                processed_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS batch_requests_batch
+                ON batch_requests (batch_id);
+            CREATE TABLE IF NOT EXISTS summary_manifest (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                eo_number INTEGER,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS uploaded_files (
+                sha256 TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                uploaded_at TEXT NOT NULL
+            );
         """)
+        self._add_missing_columns(conn, "runs", {
+            "poll_count": "INTEGER",
+            "detect_seconds": "REAL",
+            "build_seconds": "REAL",
+            "deploy_seconds": "REAL",
+            "skip_reason": "TEXT",
+            "content_hash": "TEXT",
+        })
+        self._add_missing_columns(conn, "token_usage", {
+            "time_to_first_token": "REAL",
+            "tokens_per_second": "REAL",
+        })
+        self._add_missing_columns(conn, "batch_requests", {
+            "response_key": "TEXT",
+        })
+        self._add_missing_columns(conn, "summary_manifest", {
+            "normalizer_version": "INTEGER",
+        })
         conn.commit()
         conn.close()
 
+    def _add_missing_columns(
+        self, conn: sqlite3.Connection, table: str, columns: dict[str, str]
+    ):
+        """Add columns introduced after `table` was first created."""
+        existing = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+        for name, definition in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
@@ -62,13 +156,21 @@ class PropagateDB:
         poll_seconds: int | None = None,
         error: str | None = None,
         deployed: bool = False,
+        poll_count: int | None = None,
+        detect_seconds: float | None = None,
+        build_seconds: float | None = None,
+        deploy_seconds: float | None = None,
+        skip_reason: str | None = None,
+        content_hash: str | None = None,
     ):
         conn = self._connect()
         conn.execute(
             """UPDATE runs SET
                 finished_at = ?, eos_found = ?, eos_new = ?,
                 batch_id = ?, poll_seconds = ?, status = ?,
-                error = ?, deployed = ?
+                error = ?, deployed = ?, poll_count = ?, detect_seconds = ?,
+                build_seconds = ?, deploy_seconds = ?, skip_reason = ?,
+                content_hash = ?
             WHERE id = ?""",
             (
                 datetime.now(timezone.utc).isoformat(),
@@ -79,12 +181,28 @@ class PropagateDB:
                 status,
                 error,
                 1 if deployed else 0,
+                poll_count,
+                detect_seconds,
+                build_seconds,
+                deploy_seconds,
+                skip_reason,
+                content_hash,
                 run_id,
             ),
         )
         conn.commit()
         conn.close()
 
+    def get_deployed_content_hash(self) -> str | None:
+        """Content hash of the site the most recent deploy published."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT content_hash FROM runs WHERE deployed = 1"
+            " ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        conn.close()
+        return row["content_hash"] if row else None
+
     def insert_eo(self, run_id: int, eo_number: int, president: str, status: str):
         conn = self._connect()
         conn.execute(
@@ -128,3 +246,325 @@ class PropagateDB:
         ).fetchone()
         conn.close()
         return dict(row) if row else None
+
+    def get_sync_state(self, president: str) -> dict | None:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT * FROM sync_state WHERE president = ?", (president,)
+        ).fetchone()
+        conn.close()
+        if not row:
+            return None
+        state = dict(row)
+        state["document_numbers"] = json.loads(state["document_numbers"])
+        return state
+
+    def set_sync_state(
+        self,
+        president: str,
+        last_publication_date: str,
+        document_numbers: list[str],
+    ):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state"
+            " (president, last_publication_date, document_numbers, synced_at)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                president,
+                last_publication_date,
+                json.dumps(sorted(document_numbers)),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def upsert_catalog(self, president: str, records: list[dict]):
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO eo_catalog"
+            " (president, document_number, eo_number, publication_date, data)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    president,
+                    r["document_number"],
+                    r.get("executive_order_number"),
+                    r.get("publication_date"),
+                    json.dumps(r),
+                )
+                for r in records
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def get_catalog(self, president: str) -> list[dict]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT data FROM eo_catalog WHERE president = ? ORDER BY eo_number",
+            (president,),
+        ).fetchall()
+        conn.close()
+        return [json.loads(r["data"]) for r in rows]
+
+    def record_usage(self, run_id: int, eo_number: int, president: str, usage: dict):
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO token_usage"
+            " (run_id, eo_number, president, input_tokens, output_tokens,"
+            " cache_creation_input_tokens, cache_read_input_tokens,"
+            " time_to_first_token, tokens_per_second, recorded_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, eo_number, president,
+                usage.get("input_tokens") or 0,
+                usage.get("output_tokens") or 0,
+                usage.get("cache_creation_input_tokens") or 0,
+                usage.get("cache_read_input_tokens") or 0,
+                usage.get("time_to_first_token"),
+                usage.get("tokens_per_second"),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_usage_for_run(self, run_id: int) -> dict:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT COUNT(*) AS requests,"
+            " COALESCE(SUM(input_tokens), 0) AS input_tokens,"
+            " COALESCE(SUM(output_tokens), 0) AS output_tokens,"
+            " COALESCE(SUM(cache_creation_input_tokens), 0)"
+            "  AS cache_creation_input_tokens,"
+            " COALESCE(SUM(cache_read_input_tokens), 0) AS cache_read_input_tokens,"
+            " AVG(time_to_first_token) AS time_to_first_token,"
+            " AVG(tokens_per_second) AS tokens_per_second"
+            " FROM token_usage WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+        conn.close()
+        return dict(row)
+
+    def get_file_id(self, sha256: str) -> str | None:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT file_id FROM uploaded_files WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        conn.close()
+        return row["file_id"] if row else None
+
+    def record_file(self, sha256: str, file_id: str, filename: str, size_bytes: int):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO uploaded_files"
+            " (sha256, file_id, filename, size_bytes, uploaded_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                sha256, file_id, filename, size_bytes,
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def record_batch(
+        self,
+        batch_id: str,
+        president: str,
+        requests: list[tuple[str, int]],
+        run_id: int | None = None,
+        status: str = "in_progress",
+        response_keys: Mapping[str, str] | None = None,
+    ):
+        """
+        Add a submitted batch and its (custom_id, eo_number) requests.
+
+        `response_keys` maps custom IDs to the response cache key of their
+        request, so results can be cached without rebuilding the document.
+        """
+        response_keys = response_keys or {}
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO batches"
+            " (batch_id, president, run_id, status, request_count, submitted_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (batch_id, president, run_id, status, len(requests), now),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO batch_requests"
+            " (custom_id, batch_id, eo_number, president, submitted_at,"
+            " response_key)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    custom_id, batch_id, eo_number, president, now,
+                    response_keys.get(custom_id),
+                )
+                for custom_id, eo_number in requests
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def update_batch(
+        self,
+        batch_id: str,
+        president: str | None,
+        status: str,
+        submitted_at: str | None = None,
+        ended_at: str | None = None,
+    ):
+        """Record a batch's API status, adding batches submitted elsewhere."""
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO batches (batch_id, president, status, submitted_at, ended_at)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(batch_id) DO UPDATE SET status = excluded.status,"
+            " ended_at = COALESCE(excluded.ended_at, ended_at)",
+            (batch_id, president, status, submitted_at, ended_at),
+        )
+        conn.commit()
+        conn.close()
+
+    def record_batch_results(
+        self, batch_id: str, results: list[tuple[str, int, str, str]]
+    ):
+        """Mark (custom_id, eo_number, president, result) requests as applied."""
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._connect()
+        conn.executemany(
+            "INSERT INTO batch_requests"
+            " (custom_id, batch_id, eo_number, president, result, processed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(custom_id) DO UPDATE SET"
+            " result = excluded.result, processed_at = excluded.processed_at",
+            [
+                (custom_id, batch_id, eo_number, president, result, now)
+                for custom_id, eo_number, president, result in results
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def finish_batch(self, batch_id: str):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE batches SET processed_at = ?,"
+            " request_count = MAX(request_count,"
+            "  (SELECT COUNT(*) FROM batch_requests WHERE batch_id = ?))"
+            " WHERE batch_id = ?",
+            (datetime.now(timezone.utc).isoformat(), batch_id, batch_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_batch(self, batch_id: str) -> dict | None:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT * FROM batches WHERE batch_id = ?", (batch_id,)
+        ).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def get_batches(self, limit: int = 20) -> list[dict]:
+        """Most recent batches with a count of requests per result."""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT b.*,"
+            " COUNT(r.custom_id) FILTER (WHERE r.result = 'succeeded') AS succeeded,"
+            " COUNT(r.custom_id) FILTER (WHERE r.result IS NOT NULL"
+            "  AND r.result != 'succeeded') AS failed,"
+            " COUNT(r.custom_id) FILTER (WHERE r.result IS NULL) AS unapplied"
+            " FROM batches b LEFT JOIN batch_requests r ON r.batch_id = b.batch_id"
+            " GROUP BY b.batch_id"
+            " ORDER BY b.submitted_at DESC, b.batch_id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+
+    def get_batch_requests(self, batch_id: str) -> list[dict]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT * FROM batch_requests WHERE batch_id = ? ORDER BY custom_id",
+            (batch_id,),
+        ).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+
+    def get_summary_manifest(self) -> list[dict]:
+        """
+        Path, mtime, size, hash and normalizer version of every summary file
+        in the manifest.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT path, mtime, size, sha256, normalizer_version"
+            " FROM summary_manifest"
+        ).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+
+    def upsert_summary_manifest(
+        self, entries: list[tuple[str, float, int, str, dict]], normalizer_version: int
+    ):
+        """
+        Store (path, mtime, size, sha256, record) manifest entries, whose
+        records were built by `normalizer_version` of the normalizer.
+        """
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO summary_manifest"
+            " (path, mtime, size, sha256, eo_number, record, normalizer_version)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    path, mtime, size, sha256,
+                    record.get("eo_number"), json.dumps(record),
+                    normalizer_version,
+                )
+                for path, mtime, size, sha256, record in entries
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def touch_summary_manifest(self, entries: list[tuple[str, float, str]]):
+        """Update the mtime and record timestamp of unchanged summaries."""
+        conn = self._connect()
+        conn.executemany(
+            "UPDATE summary_manifest SET mtime = ?,"
+            " record = json_set(record, '$.timestamp', ?) WHERE path = ?",
+            [(mtime, timestamp, path) for path, mtime, timestamp in entries],
+        )
+        conn.commit()
+        conn.close()
+
+    def delete_summary_manifest(self, paths: list[str]):
+        conn = self._connect()
+        conn.executemany(
+            "DELETE FROM summary_manifest WHERE path = ?", [(p,) for p in paths]
+        )
+        conn.commit()
+        conn.close()
+
+    def iter_summary_records(self) -> Iterator[dict]:
+        """
+        Normalized summary records, highest EO number first.
+
+        Rows are read from the cursor as the caller iterates, so the full
+        set of records is never held in memory.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT record FROM summary_manifest ORDER BY eo_number DESC, path"
+            )
+            for row in cursor:
+                yield json.loads(row["record"])
+        finally:
+            conn.close()
@@ -1,60 +1,173 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import asdict
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, Iterator, List
+from urllib.parse import urlparse
 
-import requests
-from propagate.config import PDF_DIR
+from propagate.config import DOWNLOAD_WORKERS, DOWNLOADS_PER_HOST
+from propagate.db import PropagateDB
+from propagate.httpclient import download_file, get_json
 from propagate.logging_config import get_logger
 from propagate.models import ExecutiveOrder
+from propagate.pdf_store import compact_manifest, find_corrupt_pdfs, record_pdf
 
 logger = get_logger(__name__)
 
-CHUNK_SIZE = 8192  # Size of chunks when downloading files
 BASE_URL = "https://www.federalregister.gov/api/v1/documents.json"
 JSON_URL = "https://www.federalregister.gov/api/v1/documents/2025-10804"
+PROGRESS_EVERY = 25  # Log download progress every N completed PDFs
+
+_host_limits: dict[str, threading.BoundedSemaphore] = {}
+_host_limits_lock = threading.Lock()
+
+
+def _host_limit(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(DOWNLOADS_PER_HOST)
+        return _host_limits[host]
+
+
+def _download_limited(order: ExecutiveOrder, force: bool) -> Path:
+    if not order.pdf_url:
+        return download_pdf(order, force)
+
+    with _host_limit(order.pdf_url):
+        return download_pdf(order, force)
+
+
+def _download_order(order: ExecutiveOrder, force: bool) -> ExecutiveOrder | None:
+    # one failed download only skips its own order, not the whole stream
+    try:
+        pdf_path = _download_limited(order, force)
+    except Exception as e:
+        logger.error(
+            "Error downloading the PDF of EO %s, skipping it: %s",
+            order.executive_order_number, e,
+        )
+        return None
+    if not pdf_path:
+        return None
+
+    order.pdf_path = pdf_path.as_posix()
+    return order
+
+
+def iter_downloaded_orders(
+    orders: Iterable[ExecutiveOrder],
+    force: bool = False,
+    workers: int = DOWNLOAD_WORKERS,
+) -> Iterator[ExecutiveOrder]:
+    """
+    Download PDFs as orders arrive and yield each order once its PDF is ready.
+
+    `orders` may be a lazy iterator such as `iter_eo_metadata`; downloads
+    start while later pages are still being fetched. At most `workers`
+    downloads run at once (DOWNLOADS_PER_HOST per host), and at most twice
+    that many are queued ahead of the consumer. Orders are yielded in
+    completion order with `pdf_path` filled in; orders whose download fails
+    are logged and skipped.
+    """
+    workers = max(1, workers)
+    completed = 0
+
+    def finished(futures) -> Iterator[ExecutiveOrder]:
+        nonlocal completed
+        for future in futures:
+            order = future.result()
+            completed += 1
+            if completed % PROGRESS_EVERY == 0:
+                logger.info("Downloaded %d PDFs", completed)
+            if order is not None:
+                yield order
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for order in orders:
+            pending.add(executor.submit(_download_order, order, force))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+
+        for future in as_completed(pending):
+            yield from finished([future])
+
+    if completed % PROGRESS_EVERY:
+        logger.info("Downloaded %d PDFs", completed)
 
 
 def download_all_pdfs(
-    orders: List[ExecutiveOrder], force: bool = False
+    orders: List[ExecutiveOrder],
+    force: bool = False,
+    workers: int = DOWNLOAD_WORKERS,
 ) -> list[ExecutiveOrder]:
-    success_orders = []
-    for order in orders:
-        pdf_path = download_pdf(order, force)
-        if not pdf_path:
-            continue
-
-        order.pdf_path = pdf_path.as_posix()
-        success_orders.append(order)
+    """
+    Download the PDF for every order using a bounded thread pool.
 
-    return success_orders
+    Orders are returned in their original order with `pdf_path` filled in.
+    """
+    downloaded = {id(order) for order in iter_downloaded_orders(orders, force, workers)}
+    return [order for order in orders if id(order) in downloaded]
 
 
 def download_pdf(order: ExecutiveOrder, force: bool = False) -> Path:
     if not order.pdf_url:
         raise ValueError("No PDF URL available")
 
-    filename = f"EO-{order.executive_order_number or 'unknown'}.pdf"
-    filepath = PDF_DIR / filename
+    filepath = order.get_pdf_path()
 
     # Check if file already exists
     if filepath.exists() and not force:
         return filepath
 
-    response = requests.get(order.pdf_url, stream=True)
-    response.raise_for_status()
-
-    with open(filepath, "wb") as f:
-        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-            f.write(chunk)
+    sha256 = download_file(order.pdf_url, filepath)
+    if sha256:
+        record_pdf(filepath, sha256, order.pdf_url)
 
     return filepath
 
 
-def fetch_eo_metadata(
+def verify_pdfs(workers: int = DOWNLOAD_WORKERS) -> list[Path]:
+    """
+    Re-hash the PDF store and re-fetch only the files that fail verification.
+
+    Corrupt files whose source URL is unknown are removed so the next run
+    downloads them again. Returns the corrupt paths that were found.
+    """
+    corrupt, manifest = find_corrupt_pdfs(workers)
+
+    for path in corrupt:
+        entry = manifest.pop(path.name, None)
+        url = entry.get("url") if entry else None
+        path.unlink()
+
+        if not url:
+            logger.error("Removed corrupt %s; it will be re-downloaded", path.name)
+            continue
+
+        logger.info("Re-fetching corrupt %s", path.name)
+        try:
+            sha256 = download_file(url, path)
+        except Exception as e:
+            logger.error("Error re-fetching %s: %s", path.name, e)
+            continue
+
+        manifest[path.name] = {**entry, "sha256": sha256, "size": path.stat().st_size}
+
+    compact_manifest(manifest)
+    return corrupt
+
+
+def iter_eo_metadata(
     president: str = "donald-trump",
     start_date: str = "01/20/2000",
     end_date: str = "12/31/2030",
     per_page: int = 1000,
-) -> List[ExecutiveOrder]:
+    published_since: str | None = None,
+) -> Iterator[ExecutiveOrder]:
+    """Yield executive orders page by page as the Federal Register returns them."""
     params = {
         "conditions[correction]": 0,
         "conditions[president]": president,
@@ -71,6 +184,7 @@ def fetch_eo_metadata(
             "type",
             "subtype",
             "signing_date",
+            "publication_date",
             "start_page",
             "title",
             "disposition_notes",
@@ -84,8 +198,9 @@ def fetch_eo_metadata(
         "order": "executive_order",
         "per_page": per_page,
     }
+    if published_since:
+        params["conditions[publication_date][gte]"] = published_since
 
-    all_orders = []
     page_number = 1
     current_url = BASE_URL
 
@@ -93,18 +208,15 @@ def fetch_eo_metadata(
         logger.info("Fetching page %d...", page_number)
 
         if page_number == 1:
-            response = requests.get(current_url, params=params)
+            data = get_json(current_url, params=params)
         else:
-            response = requests.get(current_url)
-
-        response.raise_for_status()
-        data = response.json()
+            data = get_json(current_url)
 
         results = data.get("results", [])
         if results:
             orders = [ExecutiveOrder.from_dict(item) for item in results]
             logger.info("Found %d executive orders on page %d", len(orders), page_number)
-            all_orders.extend(orders)
+            yield from orders
 
         next_page_url = data.get("next_page_url")
         if next_page_url:
@@ -113,12 +225,103 @@ def fetch_eo_metadata(
         else:
             break
 
-    return all_orders
+
+def fetch_eo_metadata(
+    president: str = "donald-trump",
+    start_date: str = "01/20/2000",
+    end_date: str = "12/31/2030",
+    per_page: int = 1000,
+    published_since: str | None = None,
+) -> List[ExecutiveOrder]:
+    return list(
+        iter_eo_metadata(
+            president=president,
+            start_date=start_date,
+            end_date=end_date,
+            per_page=per_page,
+            published_since=published_since,
+        )
+    )
+
+
+def sync_eo_metadata(
+    db: PropagateDB,
+    president: str = "donald-trump",
+    full: bool = False,
+) -> List[ExecutiveOrder]:
+    """
+    Incrementally sync EO metadata into the local catalog in `db`.
+
+    Only documents published on or after the stored watermark are requested.
+    The watermark date is inclusive because the Federal Register can publish
+    more documents later on the same day; the document numbers already seen
+    on that date tell us which of them are actually new.
+    """
+    state = None if full else db.get_sync_state(president)
+
+    if state:
+        published_since = state["last_publication_date"]
+        logger.info(
+            "Syncing %s metadata published since %s", president, published_since
+        )
+        orders = fetch_eo_metadata(
+            president=president, published_since=published_since
+        )
+    else:
+        logger.info("Running full metadata sync for %s", president)
+        orders = fetch_eo_metadata(president=president)
+
+    seen = set(state["document_numbers"]) if state else set()
+    new_orders = [o for o in orders if o.document_number not in seen]
+    logger.info("Found %d new executive orders for %s", len(new_orders), president)
+
+    if orders:
+        db.upsert_catalog(president, [asdict(o) for o in orders])
+
+    dated = [o for o in orders if o.publication_date]
+    if dated:
+        last_date = max(o.publication_date for o in dated)
+        document_numbers = [
+            o.document_number for o in dated if o.publication_date == last_date
+        ]
+        if state and state["last_publication_date"] == last_date:
+            document_numbers += state["document_numbers"]
+        db.set_sync_state(president, last_date, list(set(document_numbers)))
+
+    return [ExecutiveOrder.from_dict(data) for data in db.get_catalog(president)]
 
 
 def fetch_all_executive_orders(
     president: str = "donald-trump",
     force: bool = False,
+    db: PropagateDB | None = None,
 ) -> List[ExecutiveOrder]:
-    orders = fetch_eo_metadata(president=president)
+    if db is not None:
+        orders = sync_eo_metadata(db, president=president)
+    else:
+        orders = fetch_eo_metadata(president=president)
     return download_all_pdfs(orders, force)
+
+
+def stream_executive_orders(
+    president: str = "donald-trump",
+    force: bool = False,
+    db: PropagateDB | None = None,
+    select: Callable[[ExecutiveOrder], bool] | None = None,
+) -> Iterator[ExecutiveOrder]:
+    """
+    Streaming counterpart of `fetch_all_executive_orders`.
+
+    Metadata pages, PDF downloads and the consumer overlap: each order is
+    yielded as soon as its PDF is on disk. `select` filters orders before
+    their PDF is downloaded.
+    """
+    if db is not None:
+        orders = iter(sync_eo_metadata(db, president=president))
+    else:
+        orders = iter_eo_metadata(president=president)
+
+    if select is not None:
+        orders = filter(select, orders)
+
+    yield from iter_downloaded_orders(orders, force)
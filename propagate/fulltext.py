@@ -0,0 +1,135 @@
+import re
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from pathlib import Path
+
+from propagate.config import HTTP_TIMEOUT, TEXT_DIR
+from propagate.httpclient import get_session
+from propagate.logging_config import get_logger
+from propagate.models import ExecutiveOrder
+
+logger = get_logger(__name__)
+
+# Federal Register XML elements that start a new paragraph
+XML_BLOCK_TAGS = {
+    "AMDPAR", "DATE", "EXECORDR", "EXTRACT", "FP", "GPOTABLE", "HD", "LI", "P",
+    "PLACE", "PRES", "PRORDER", "PSIG", "ROW", "SIG", "TITLE3",
+}
+# Page markers, graphics, filing lines and billing codes carry no text worth
+# sending
+XML_SKIP_TAGS = {"BILCOD", "FRDOC", "GID", "GPH", "PRTPAGE"}
+
+HTML_BLOCK_TAGS = {
+    "p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "section", "table",
+}
+HTML_SKIP_TAGS = {"script", "style", "head", "nav"}
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace inside paragraphs and separate them by a blank line."""
+    paragraphs = (" ".join(p.split()) for p in re.split(r"\n\s*\n", text))
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def xml_to_text(xml: str | bytes) -> str:
+    """Convert Federal Register full-text XML to plain text."""
+    root = ET.fromstring(xml)
+    parts: list[str] = []
+
+    def walk(el: ET.Element):
+        if el.tag in XML_SKIP_TAGS:
+            return
+        block = el.tag in XML_BLOCK_TAGS
+        if block:
+            parts.append("\n\n")
+        if el.text:
+            parts.append(el.text)
+        for child in el:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append("\n\n")
+
+    walk(root)
+    return _normalize("".join(parts))
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in HTML_BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in HTML_SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in HTML_BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str | bytes) -> str:
+    """Convert a Federal Register body HTML page to plain text."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return _normalize("".join(parser.parts))
+
+
+def get_text_path(order: ExecutiveOrder) -> Path:
+    return TEXT_DIR / f"EO-{order.executive_order_number or 'unknown'}.txt"
+
+
+def fetch_full_text(order: ExecutiveOrder) -> str | None:
+    """
+    Return the plain text of an order, downloading and caching it if needed.
+
+    The full-text XML is preferred over the body HTML. Returns None when
+    neither is available so callers can fall back to the PDF.
+    """
+    text_path = get_text_path(order)
+    if text_path.exists():
+        return text_path.read_text()
+
+    sources = [
+        (order.full_text_xml_url, xml_to_text),
+        (order.body_html_url, html_to_text),
+    ]
+    for url, convert in sources:
+        if not url:
+            continue
+        try:
+            response = get_session().get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            text = convert(response.content)
+        except Exception as e:
+            logger.error(
+                "Error fetching text for EO %s from %s: %s",
+                order.executive_order_number, url, e,
+            )
+            continue
+
+        if not text:
+            continue
+
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = text_path.with_name(f"{text_path.name}.tmp")
+        tmp_path.write_text(text)
+        tmp_path.replace(text_path)
+        return text
+
+    return None
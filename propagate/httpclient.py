@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from propagate.config import (
+    HTTP_BACKOFF,
+    HTTP_CACHE_DIR,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_TIMEOUT,
+)
+from propagate.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 8192  # Size of chunks when streaming response bodies
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def create_session(
+    retries: int = HTTP_RETRIES,
+    backoff: float = HTTP_BACKOFF,
+    pool_size: int = HTTP_POOL_SIZE,
+) -> requests.Session:
+    """
+    Create a keep-alive session that retries idempotent requests with backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+    return _session
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _validators_path(url: str) -> Path:
+    return HTTP_CACHE_DIR / f"{_cache_key(url)}.json"
+
+
+def _body_path(url: str) -> Path:
+    return HTTP_CACHE_DIR / f"{_cache_key(url)}.body"
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_validators(url: str) -> dict | None:
+    path = _validators_path(url)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_validators(url: str, response: requests.Response):
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+
+    validators = {"url": url, "etag": etag, "last_modified": last_modified}
+    _write_atomic(_validators_path(url), json.dumps(validators).encode("utf-8"))
+
+
+def conditional_headers(url: str) -> dict[str, str]:
+    validators = load_validators(url)
+    if not validators:
+        return {}
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def get_json(url: str, params: dict | None = None) -> dict:
+    """
+    GET a JSON document, revalidating against the on-disk copy when possible.
+
+    A 304 response is answered from the cached body without a transfer.
+    """
+    full_url = requests.Request("GET", url, params=params).prepare().url
+    body_path = _body_path(full_url)
+    headers = conditional_headers(full_url) if body_path.exists() else {}
+
+    response = get_session().get(full_url, headers=headers, timeout=HTTP_TIMEOUT)
+    if response.status_code == 304:
+        logger.debug("Not modified: %s", full_url)
+        with open(body_path, "rb") as f:
+            return json.load(f)
+
+    response.raise_for_status()
+    data = response.json()
+
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        _write_atomic(body_path, response.content)
+        save_validators(full_url, response)
+
+    return data
+
+
+def _expected_size(response: requests.Response, offset: int) -> int | None:
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+
+def download_file(url: str, dest: Path) -> str | None:
+    """
+    Download `url` to `dest` atomically, resuming a previous partial transfer.
+
+    Bytes are streamed into `<dest>.part`. An existing part file is resumed
+    with a Range request, guarded by If-Range so a changed file restarts from
+    scratch; without a stored ETag or Last-Modified to guard it, the part
+    file is discarded instead. A 416 reply means the part file already
+    holds every byte (it is then finished off) or is longer than the file
+    (it is then discarded and the download restarted). The finished file is
+    checked against the advertised size and hashed before it is renamed into
+    place, so `dest` only ever holds a complete download.
+
+    When `dest` already exists the request is made conditional instead.
+
+    Returns:
+        The SHA-256 hex digest of the new file, or None if the server reports
+        `dest` unchanged.
+    """
+    part_path = dest.with_name(f"{dest.name}.part")
+    offset = part_path.stat().st_size if part_path.exists() else 0
+
+    if dest.exists():
+        headers = conditional_headers(url)
+        offset = 0
+    elif offset:
+        validators = load_validators(url) or {}
+        if_range = validators.get("etag") or validators.get("last_modified")
+        if if_range:
+            headers = {"Range": f"bytes={offset}-", "If-Range": if_range}
+        else:
+            # a bare Range could splice bytes of a changed file onto old ones
+            logger.info("Restarting %s: nothing to validate the partial file", url)
+            part_path.unlink()
+            offset = 0
+            headers = {}
+    else:
+        headers = {}
+    # Byte counts and ranges must refer to the stored bytes, not a gzip stream
+    headers["Accept-Encoding"] = "identity"
+
+    with get_session().get(
+        url, headers=headers, stream=True, timeout=HTTP_TIMEOUT
+    ) as response:
+        if response.status_code == 304:
+            logger.debug("Not modified: %s", url)
+            return None
+
+        if response.status_code == 416 and offset:
+            # Content-Range: bytes */<total>
+            total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            if total.isdigit() and int(total) == offset:
+                logger.info("Partial download of %s was already complete", url)
+                digest = sha256_file(part_path)
+                os.replace(part_path, dest)
+                return digest
+            logger.info("Restarting %s: partial file does not match", url)
+            part_path.unlink()
+            return download_file(url, dest)
+
+        response.raise_for_status()
+
+        if response.status_code == 206 and offset:
+            logger.info("Resuming %s at byte %d", url, offset)
+            mode = "ab"
+        else:
+            offset = 0
+            mode = "wb"
+
+        expected_size = _expected_size(response, offset)
+        save_validators(url, response)
+
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+
+    size = part_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise IOError(
+            f"Incomplete download of {url}: got {size} of {expected_size} bytes"
+        )
+
+    digest = sha256_file(part_path)
+    os.replace(part_path, dest)
+    return digest
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
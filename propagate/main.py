@@ -2,11 +2,17 @@
 import json
 
 import requests
-from propagate.config import PDF_DIR
-from propagate.federalregister import fetch_all_executive_orders
+from propagate.batch_manager import record_batch_job
+from propagate.config import DB_PATH, PDF_DIR, SUMMARY_WORKERS
+from propagate.db import PropagateDB
+from propagate.federalregister import stream_executive_orders, verify_pdfs
 from propagate.logging_config import get_logger, setup_logging
 from propagate.models import President
-from propagate.summarize_eo import batch_summarize_with_claude, process_pdf
+from propagate.summarize_eo import (
+    BatchSubmitError,
+    batch_summarize_with_claude,
+    summarize_orders,
+)
 
 logger = get_logger(__name__)
 
@@ -33,75 +39,136 @@ def print_last_processed(orders):
     )
 
 
-def print_pending(orders):
-    if not orders:
-        return
-    logger.info("Pending EOs (%d)", len(orders))
-    for order in sorted(orders, key=lambda o: o.signing_date or ""):
-        logger.info("  EO %s: %s (%s)", order.executive_order_number, order.title, order.signing_date)
-
-
 def fetch_and_process_president(
-    president: President, batch: bool = False, force: bool = False
+    president: President,
+    batch: bool = False,
+    force: bool = False,
+    workers: int = SUMMARY_WORKERS,
 ):
-    orders = []
-    try:
-        logger.info("Starting to fetch and download executive orders for %s", president.name)
-        orders = fetch_all_executive_orders(president=president.key, force=force)
-    except requests.exceptions.RequestException as e:
-        logger.error("Error fetching data: %s", e)
+    processed = []
+    seen = set()
 
-    # Set president information on each order
-    for order in orders:
+    def select(order) -> bool:
         order.president = president.name
 
-    print_last_processed(orders)
+        if order.executive_order_number in seen:
+            logger.error("Duplicate order found: %s", order.executive_order_number)
+            return False
+        seen.add(order.executive_order_number)
 
-    if not force:
-        orders = [order for order in orders if not order.summary_exists()]
+        if not force and order.summary_exists():
+            processed.append(order)
+            return False
 
-    print_pending(orders)
+        logger.info(
+            "Pending EO %s: %s (%s)",
+            order.executive_order_number, order.title, order.signing_date,
+        )
+        return True
 
-    if len(orders) == 0:
-        logger.info("No orders to process for %s", president.name)
-        return
+    logger.info(
+        "Starting to fetch and download executive orders for %s", president.name
+    )
+    # Orders arrive as soon as their PDF is downloaded, so summarization or
+    # batch building overlaps with metadata paging and the remaining downloads
+    orders = stream_executive_orders(
+        president=president.key, force=force, select=select
+    )
 
-    # find duplicate orders
-    for order in orders:
-        if order.executive_order_number in [
-            o.executive_order_number for o in orders if o != order
-        ]:
-            logger.error("Duplicate order found: %s", order.executive_order_number)
-            # remove the duplicate
-            orders.remove(order)
+    try:
+        if batch:
+            submit_batch(orders, president)
+        else:
+            process_orders(orders, president, force, workers)
+    except requests.exceptions.RequestException as e:
+        logger.error("Error fetching data: %s", e)
+    except BatchSubmitError as e:
+        # its batches are recorded; carry on with the next president
+        logger.error(
+            "Error submitting batches for %s: %s", president.name, e.__cause__ or e
+        )
+
+    print_last_processed(processed)
 
-    if batch:
-        # For batch mode with force, we need to pass all orders
-        # For batch mode without force, orders are already filtered
-        response, request_ids = batch_summarize_with_claude(orders, president.key)
 
+def submit_batch(orders, president: President):
+    try:
+        job = batch_summarize_with_claude(orders, president.key)
+    except BatchSubmitError as e:
+        # the batches that were created still have to be tracked
+        record_batch_job(PropagateDB(DB_PATH), e.job, president.key)
+        logger.error(
+            "Recorded %d batches created before the failure", len(e.job.batches)
+        )
+        raise
+    if job is None:
+        logger.info("No orders to process for %s", president.name)
+        return
+
+    for batch_id, request_ids in job.request_ids.items():
         logger.info(
             "Batch created: id=%s president=%s orders=%d",
-            response.id, president.name, len(request_ids),
+            batch_id, president.name, len(request_ids),
+        )
+        logger.info(
+            "Check status: python propagate/batch_manager.py status %s", batch_id
+        )
+        logger.info(
+            "Process when ready: python propagate/batch_manager.py process %s",
+            batch_id,
         )
-        logger.info("Check status: python propagate/batch_manager.py status %s", response.id)
-        logger.info("Process when ready: python propagate/batch_manager.py process %s", response.id)
 
-        # append request ids to a file with batch ID as header
-        with open(f"request_ids_{president.key}.txt", "a") as f:
-            f.write(f"\n# Batch ID: {response.id}\n")
-            for request_id in request_ids:
-                f.write(request_id + "\n")
+    record_batch_job(PropagateDB(DB_PATH), job, president.key)
+    logger.info("Recorded %d batches in %s", len(job.batches), DB_PATH)
 
-        logger.info("Saved request ids to request_ids_%s.txt", president.key)
-        return
+
+def process_orders(
+    orders, president: President, force: bool = False, workers: int = SUMMARY_WORKERS
+):
+    db = PropagateDB(DB_PATH)
+    run_id = db.start_run(president=president.key)
+
+    def record_usage(order, usage):
+        db.record_usage(run_id, order.executive_order_number, president.key, usage)
 
     try:
-        for order in orders:
-            process_pdf(order, force=force)
-            logger.info("Processed %s", order.executive_order_number)
+        results = summarize_orders(
+            orders, force=force, workers=workers, on_usage=record_usage
+        )
     except Exception as e:
-        logger.error("Error processing PDF", exc_info=True)
+        db.finish_run(run_id, status="failed", error=str(e))
+        raise
+
+    for result in results:
+        db.insert_eo(
+            run_id,
+            eo_number=result.order.executive_order_number,
+            president=president.key,
+            status=result.status,
+        )
+
+    failed = [r for r in results if r.status != "success"]
+    if not results:
+        status = "no_new_orders"
+        logger.info("No orders to process for %s", president.name)
+    elif len(failed) == len(results):
+        status = "failed"
+    else:
+        status = "partial_failure" if failed else "success"
+    db.finish_run(run_id, status=status, eos_new=len(results))
+
+    usage = db.get_usage_for_run(run_id)
+    if usage["requests"]:
+        logger.info(
+            "Token usage: input=%d output=%d cache_read=%d cache_write=%d",
+            usage["input_tokens"], usage["output_tokens"],
+            usage["cache_read_input_tokens"], usage["cache_creation_input_tokens"],
+        )
+    if usage["time_to_first_token"] is not None:
+        logger.info(
+            "Streaming latency: %.1fs to first token, %.0f tokens/s on average",
+            usage["time_to_first_token"], usage["tokens_per_second"] or 0,
+        )
 
 
 def main():
@@ -119,13 +186,22 @@ def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Fetch and process executive orders")
     parser.add_argument(
-        "mode", nargs="?", choices=["batch"], help="Processing mode (optional)"
+        "mode",
+        nargs="?",
+        choices=["batch", "verify"],
+        help="Processing mode (optional). verify re-hashes the PDF store",
     )
     parser.add_argument(
         "--force",
         action="store_true",
         help="Force reprocessing of all orders, overwriting existing summaries",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=SUMMARY_WORKERS,
+        help=f"Concurrent summarization requests (default: {SUMMARY_WORKERS})",
+    )
     parser.add_argument(
         "--president",
         choices=president_choices,
@@ -143,6 +219,11 @@ def main():
 
     PDF_DIR.mkdir(parents=True, exist_ok=True)
 
+    if args.mode == "verify":
+        corrupt = verify_pdfs()
+        logger.info("PDF verification complete: %d corrupt", len(corrupt))
+        return
+
     # Determine which presidents to process
     if args.president == "all":
         presidents_to_process = PRESIDENTS
@@ -150,7 +231,7 @@ def main():
         presidents_to_process = [p for p in PRESIDENTS if p.key == args.president]
 
     for president in presidents_to_process:
-        fetch_and_process_president(president, batch, force)
+        fetch_and_process_president(president, batch, force, args.workers)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from config import SUMMARIES_DIR
+from config import PDF_DIR, SUMMARIES_DIR
 
 
 @dataclass
@@ -67,6 +67,7 @@ class ExecutiveOrder:
     type: Optional[str] = None
     subtype: Optional[str] = None
     signing_date: Optional[str] = None
+    publication_date: Optional[str] = None
     start_page: Optional[int] = None
     title: Optional[str] = None
     disposition_notes: Optional[str] = None
@@ -106,5 +107,8 @@ class ExecutiveOrder:
     def get_summary_path(self) -> Path:
         return Path(f"{SUMMARIES_DIR}/EO-{self.executive_order_number}.json")
 
+    def get_pdf_path(self) -> Path:
+        return PDF_DIR / f"EO-{self.executive_order_number or 'unknown'}.pdf"
+
     def get_claude_json_path(self) -> Path:
         return Path(f"{SUMMARIES_DIR}/EO-{self.executive_order_number}-claude.json")
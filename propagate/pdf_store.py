@@ -0,0 +1,118 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from propagate.config import DOWNLOAD_WORKERS, PDF_DIR
+from propagate.httpclient import sha256_file
+from propagate.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.jsonl"
+
+_manifest_lock = threading.Lock()
+
+
+def manifest_path() -> Path:
+    return PDF_DIR / MANIFEST_NAME
+
+
+def record_pdf(path: Path, sha256: str, url: str | None):
+    """Append a manifest entry for a completed PDF download."""
+    entry = {
+        "file": path.name,
+        "sha256": sha256,
+        "size": path.stat().st_size,
+        "url": url,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with _manifest_lock:
+        with open(manifest_path(), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def load_manifest() -> dict[str, dict]:
+    """Return the latest manifest entry for each file name."""
+    entries: dict[str, dict] = {}
+    path = manifest_path()
+    if not path.exists():
+        return entries
+
+    with _manifest_lock:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.error("Skipping malformed manifest line in %s", path)
+                    continue
+                entries[entry["file"]] = entry
+    return entries
+
+
+def compact_manifest(entries: dict[str, dict]):
+    """Rewrite the manifest with a single entry per file."""
+    path = manifest_path()
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with _manifest_lock:
+        with open(tmp_path, "w") as f:
+            for name in sorted(entries):
+                f.write(json.dumps(entries[name]) + "\n")
+        tmp_path.replace(path)
+
+
+def looks_complete(path: Path) -> bool:
+    """Cheap structural check for PDFs that predate the manifest."""
+    size = path.stat().st_size
+    if size < 64:
+        return False
+    with open(path, "rb") as f:
+        header = f.read(5)
+        f.seek(max(0, size - 1024))
+        trailer = f.read()
+    return header == b"%PDF-" and b"%%EOF" in trailer
+
+
+def _check(path: Path, entry: dict | None) -> tuple[Path, str | None, bool]:
+    digest = sha256_file(path)
+    if entry is None:
+        return path, digest, looks_complete(path)
+    return path, digest, digest == entry["sha256"]
+
+
+def find_corrupt_pdfs(
+    workers: int = DOWNLOAD_WORKERS,
+) -> tuple[list[Path], dict[str, dict]]:
+    """
+    Re-hash every PDF in PDF_DIR in parallel.
+
+    Files without a manifest entry are checked structurally and, if they look
+    complete, are added to the manifest. Returns the corrupt files along with
+    the refreshed manifest.
+    """
+    manifest = load_manifest()
+    pdfs = sorted(PDF_DIR.glob("*.pdf"))
+
+    corrupt = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(lambda p: _check(p, manifest.get(p.name)), pdfs)
+        for path, digest, ok in results:
+            if not ok:
+                corrupt.append(path)
+                continue
+            if path.name not in manifest:
+                manifest[path.name] = {
+                    "file": path.name,
+                    "sha256": digest,
+                    "size": path.stat().st_size,
+                    "url": None,
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                }
+
+    logger.info("Verified %d PDFs, %d corrupt", len(pdfs), len(corrupt))
+    return corrupt, manifest
@@ -218,3 +218,5 @@ PROMPT = f"""The response should be a valid JSON object with the following field
         - implementation_timeline: Immediate effect, Phased implementation, Delayed effective date, Contingent implementation
         - precedential_value: Novel/first-of-its-kind, Consistent with historical practice, Expansion of existing policy, Restatement of existing authority
 """
+
+MERGE_PROMPT = f"""The document contains JSON summaries of consecutive page ranges of a single Executive Order, in page order. Combine them into one summary of the whole Executive Order rather than of any one range. {PROMPT}"""
@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from propagate.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MAX_BACKOFF_SECONDS = 120.0
+
+
+def _parse_reset(value: str | None) -> float | None:
+    """Seconds until an RFC 3339 rate-limit reset timestamp."""
+    if not value:
+        return None
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Concurrency gate shared by summarization workers.
+
+    The number of requests allowed in flight starts at `max_concurrency`, is
+    halved whenever the API answers 429 and grows back by one per success.
+    A 429 also pauses every worker until its retry-after (or an exponential
+    backoff) has elapsed, as does a success whose rate-limit headers say the
+    remaining request or token budget is exhausted.
+    """
+
+    def __init__(self, max_concurrency: int, base_backoff: float = 2.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.base_backoff = base_backoff
+        self._active = 0
+        self._backoff = base_backoff
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                delay = self._resume_at - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                if self._active < self.limit:
+                    self._active += 1
+                    return
+                self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def on_success(self, headers=None):
+        with self._cond:
+            self._backoff = self.base_backoff
+            if self.limit < self.max_concurrency:
+                self.limit += 1
+
+            if headers is not None:
+                self._pause_if_exhausted(headers)
+            self._cond.notify_all()
+
+    def on_rate_limited(self, retry_after: float | None = None) -> float:
+        with self._cond:
+            delay = retry_after if retry_after is not None else self._backoff
+            delay = min(delay, MAX_BACKOFF_SECONDS)
+            self._backoff = min(self._backoff * 2, MAX_BACKOFF_SECONDS)
+            self.limit = max(1, self.limit // 2)
+            self._pause(delay)
+            self._cond.notify_all()
+
+        logger.info(
+            "Rate limited, pausing %.1fs with concurrency %d", delay, self.limit
+        )
+        return delay
+
+    def _pause_if_exhausted(self, headers):
+        for kind in ("requests", "tokens"):
+            if headers.get(f"anthropic-ratelimit-{kind}-remaining") != "0":
+                continue
+            reset = _parse_reset(headers.get(f"anthropic-ratelimit-{kind}-reset"))
+            if reset:
+                logger.info("Rate limit %s exhausted, pausing %.1fs", kind, reset)
+                self._pause(reset)
+
+    def _pause(self, delay: float):
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from propagate.config import (
+    MAX_TOKENS,
+    MODEL,
+    RESPONSE_CACHE,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_ENTRIES,
+)
+from propagate.logging_config import get_logger
+from propagate.prompts import PROMPT, SYSTEM_PROMPT_EXECUTIVE_ORDER
+
+logger = get_logger(__name__)
+
+
+def response_key(document: dict) -> str:
+    """
+    Content address of a summary request.
+
+    Covers the document sent to Claude plus everything else that shapes the
+    response: the system prompt, the instructions, the model and MAX_TOKENS.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        json.dumps(document, sort_keys=True),
+        SYSTEM_PROMPT_EXECUTIVE_ORDER,
+        PROMPT,
+        MODEL or "",
+        str(MAX_TOKENS),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return RESPONSE_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def get_cached_response(key: str) -> dict | None:
+    if not RESPONSE_CACHE:
+        return None
+
+    path = _entry_path(key)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # bump the mtime so eviction drops the least recently used entries
+    os.utime(path)
+    return data
+
+
+def cache_response(key: str, claude_json: dict):
+    if not RESPONSE_CACHE:
+        return
+
+    path = _entry_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(claude_json, f)
+    os.replace(tmp_path, path)
+
+
+def evict_responses(max_entries: int = RESPONSE_CACHE_MAX_ENTRIES) -> int:
+    """Delete the least recently used entries beyond `max_entries`."""
+    if not RESPONSE_CACHE_DIR.exists():
+        return 0
+
+    entries = sorted(
+        RESPONSE_CACHE_DIR.glob("*/*.json"), key=lambda p: p.stat().st_mtime
+    )
+    excess = entries[: max(0, len(entries) - max_entries)]
+    for path in excess:
+        path.unlink(missing_ok=True)
+
+    if excess:
+        logger.info("Evicted %d cached responses", len(excess))
+    return len(excess)
@@ -3,25 +3,39 @@ import subprocess
 import time
 from pathlib import Path
 
-from propagate.batch_manager import download_and_process_batch
+from propagate.batch_manager import download_and_process_batch, record_batch_job
+from propagate.batch_watcher import BatchWatcher
 from propagate.build import build_from_summaries
-from propagate.config import PDF_DIR
+from propagate.config import BATCH_MAX_ATTEMPTS, DB_PATH, PDF_DIR, WEB_DATA_DIR
 from propagate.db import PropagateDB
 from propagate.federalregister import fetch_all_executive_orders
 from propagate.logging_config import get_logger, setup_logging
 from propagate.models import PRESIDENTS
-from propagate.summarize_eo import batch_summarize_with_claude
-from propagate.util import get_client
+from propagate.summarize_eo import (
+    BatchJob,
+    BatchSubmitError,
+    batch_summarize_with_claude,
+    parse_custom_id,
+)
+from propagate.webdata import content_hash
 
 logger = get_logger(__name__)
 
 MAX_POLL_SECONDS = 4 * 60 * 60  # 4 hours
-POLL_INTERVAL = 120  # 2 minutes
 DEFAULT_PRESIDENT = PRESIDENTS[0]
+# web app files that, along with the built data, determine the deployed site
+WEB_SOURCES = [
+    Path("web/index.html"),
+    Path("web/package.json"),
+    Path("web/package-lock.json"),
+    Path("web/tsconfig.json"),
+    Path("web/vite.config.ts"),
+    Path("web/src"),
+]
 
 
 class PipelineRunner:
-    def __init__(self, db_path: Path | str = "propagate.db"):
+    def __init__(self, db_path: Path | str = DB_PATH):
         self.db = PropagateDB(db_path)
 
     def run(self):
@@ -34,10 +48,21 @@ class PipelineRunner:
             self.db.finish_run(run_id, status="failed", error=str(e))
             logger.error("Pipeline failed", exc_info=True)
 
+    def _submit(self, orders, president, run_id: int, on_usage) -> BatchJob | None:
+        """Submit a batch job and record every batch it created in the ledger."""
+        try:
+            job = batch_summarize_with_claude(orders, president.key, on_usage=on_usage)
+        except BatchSubmitError as e:
+            record_batch_job(self.db, e.job, president.key, run_id)
+            raise
+        if job is not None:
+            record_batch_job(self.db, job, president.key, run_id)
+        return job
+
     def _execute(self, run_id: int, president):
         logger.info("Fetching executive orders for %s", president.name)
         PDF_DIR.mkdir(parents=True, exist_ok=True)
-        orders = fetch_all_executive_orders(president=president.key)
+        orders = fetch_all_executive_orders(president=president.key, db=self.db)
 
         for order in orders:
             order.president = president.name
@@ -54,35 +79,64 @@ class PipelineRunner:
                 status="no_new_orders",
                 eos_found=eos_found,
                 eos_new=0,
+                skip_reason="no_new_orders",
             )
             logger.info("No new orders to process")
             return
 
-        logger.info("Submitting batch for %d orders", eos_new)
-        response, request_ids = batch_summarize_with_claude(new_orders, president.key)
-        batch_id = response.id
-        logger.info("Batch submitted: %s", batch_id)
-
-        logger.info("Polling for batch completion...")
-        elapsed = 0
-        while True:
-            time.sleep(POLL_INTERVAL)
-            elapsed += POLL_INTERVAL
-
-            batch = get_client().messages.batches.retrieve(batch_id)
-            status = batch.processing_status
-            logger.info("Batch poll elapsed=%ds status=%s", elapsed, status)
+        def record_usage(order, usage):
+            self.db.record_usage(
+                run_id, order.executive_order_number, president.key, usage
+            )
 
-            if status == "ended":
+        logger.info("Submitting batch for %d orders", eos_new)
+        by_number = {o.executive_order_number: o for o in new_orders}
+        batch_ids = []
+        elapsed = 0.0
+        polls = 0
+        detect_seconds = 0.0
+        attempt = 1
+        # every order may have been answered from the response cache
+        job = self._submit(new_orders, president, run_id, record_usage)
+        while job is not None:
+            batch_ids.extend(job.batch_ids)
+            logger.info("Batch submitted: %s", ",".join(job.batch_ids))
+            watcher = BatchWatcher(job.batch_ids, timeout=MAX_POLL_SECONDS - elapsed)
+
+            failed_ids = []
+            try:
+                # each batch is processed as soon as it ends
+                for ended_id in watcher.watch():
+                    logger.info("Processing results of batch %s...", ended_id)
+                    failed = download_and_process_batch(
+                        ended_id, on_usage=record_usage, db=self.db
+                    )
+                    failed_ids.extend(
+                        job.request_ids[ended_id] if failed is None else failed
+                    )
+            finally:
+                elapsed += watcher.elapsed
+                polls += watcher.polls
+                detect_seconds = max(detect_seconds, watcher.detect_seconds)
+
+            if not failed_ids:
                 break
-
-            if elapsed >= MAX_POLL_SECONDS:
-                raise TimeoutError(
-                    f"Batch {batch_id} did not complete within {MAX_POLL_SECONDS}s"
+            if attempt >= BATCH_MAX_ATTEMPTS:
+                logger.error(
+                    "%d requests still failing after %d attempts",
+                    len(failed_ids), attempt,
                 )
+                break
 
-        logger.info("Processing batch results...")
-        download_and_process_batch(batch_id)
+            attempt += 1
+            retry_orders = [by_number[parse_custom_id(uid)[1]] for uid in failed_ids]
+            logger.info(
+                "Resubmitting %d failed requests (attempt %d/%d)",
+                len(retry_orders), attempt, BATCH_MAX_ATTEMPTS,
+            )
+            job = self._submit(retry_orders, president, run_id, record_usage)
+
+        batch_id = ",".join(batch_ids) or None
 
         succeeded = []
         failed = []
@@ -119,29 +173,53 @@ class PipelineRunner:
                 eos_found=eos_found,
                 eos_new=eos_new,
                 batch_id=batch_id,
-                poll_seconds=elapsed,
+                poll_seconds=int(elapsed),
+                poll_count=polls,
+                detect_seconds=detect_seconds,
                 deployed=False,
+                skip_reason="no_successful_eos",
             )
             return
 
         logger.info("Building eo.json...")
-        build_from_summaries()
+        started = time.monotonic()
+        build_from_summaries(self.db)
+        build_seconds = time.monotonic() - started
 
-        logger.info("Deploying...")
-        subprocess.run(
-            ["cp", "eo/eo.json", "web/public/"],
-            check=True,
-        )
-        subprocess.run(
-            ["npm", "run", "build"],
-            cwd="web/",
-            check=True,
-        )
-        subprocess.run(
-            ["netlify", "deploy", "--prod"],
-            cwd="web/",
-            check=True,
+        # the site only changes when the data or the web app does
+        site_hash = content_hash(
+            WEB_SOURCES, data=[Path("eo/eo.json"), WEB_DATA_DIR]
         )
+        deploy_seconds = None
+        skip_reason = None
+        if site_hash == self.db.get_deployed_content_hash():
+            skip_reason = "unchanged"
+            logger.info("Site content %s is already deployed", site_hash[:12])
+        else:
+            logger.info("Deploying...")
+            started = time.monotonic()
+            subprocess.run(
+                ["cp", *map(str, sorted(Path("eo").glob("eo.json*"))), "web/public/"],
+                check=True,
+            )
+            subprocess.run(
+                ["cp", "-R", f"{WEB_DATA_DIR}/.", "web/public/"],
+                check=True,
+            )
+            subprocess.run(
+                ["npm", "run", "build"],
+                cwd="web/",
+                check=True,
+            )
+            build_seconds += time.monotonic() - started
+
+            started = time.monotonic()
+            subprocess.run(
+                ["netlify", "deploy", "--prod"],
+                cwd="web/",
+                check=True,
+            )
+            deploy_seconds = time.monotonic() - started
 
         status = "partial_failure" if failed else "success"
         self.db.finish_run(
@@ -150,11 +228,21 @@ class PipelineRunner:
             eos_found=eos_found,
             eos_new=eos_new,
             batch_id=batch_id,
-            poll_seconds=elapsed,
-            deployed=True,
+            poll_seconds=int(elapsed),
+            poll_count=polls,
+            detect_seconds=detect_seconds,
+            deployed=skip_reason is None,
+            build_seconds=build_seconds,
+            deploy_seconds=deploy_seconds,
+            skip_reason=skip_reason,
+            content_hash=site_hash,
         )
 
-        logger.info("Pipeline complete: %d/%d EOs processed and deployed", len(succeeded), eos_new)
+        logger.info(
+            "Pipeline complete: %d/%d EOs processed, %s",
+            len(succeeded), eos_new,
+            "deploy skipped" if skip_reason else "deployed",
+        )
 
 
 def main():
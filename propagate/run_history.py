@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+from propagate.config import DB_PATH
 from propagate.db import PropagateDB
 
 
@@ -18,6 +19,8 @@ def format_status(db: PropagateDB) -> str:
         status_str += f" ({eos_new} new EOs)"
     if last.get("deployed"):
         status_str += ", deployed"
+    elif last.get("skip_reason"):
+        status_str += f", deploy skipped ({last['skip_reason']})"
     lines.append(f"Last run:     {last_time} — {status_str}")
 
     if last.get("error"):
@@ -35,14 +38,37 @@ def format_status(db: PropagateDB) -> str:
             f" {total_processed} ever processed"
         )
 
+    usage = db.get_usage_for_run(last["id"])
+    if usage["requests"]:
+        lines.append(
+            f"Tokens:       {usage['input_tokens']} input,"
+            f" {usage['output_tokens']} output,"
+            f" {usage['cache_read_input_tokens']} cache read,"
+            f" {usage['cache_creation_input_tokens']} cache write"
+        )
+    if usage["time_to_first_token"] is not None:
+        lines.append(
+            f"Latency:      {usage['time_to_first_token']:.1f}s to first token,"
+            f" {usage['tokens_per_second'] or 0:.0f} tokens/s"
+        )
+
     if last.get("batch_id"):
         poll = last.get("poll_seconds") or 0
         minutes = poll // 60
         seconds = poll % 60
-        lines.append(
-            f"Last batch:   {last['batch_id']}"
-            f" (completed in {minutes}m {seconds}s)"
-        )
+        detail = f"completed in {minutes}m {seconds}s"
+        if last.get("poll_count"):
+            detail += (
+                f", {last['poll_count']} polls,"
+                f" detected {last.get('detect_seconds') or 0:.0f}s after ending"
+            )
+        lines.append(f"Last batch:   {last['batch_id']} ({detail})")
+
+    if last.get("build_seconds") is not None:
+        detail = f"{last['build_seconds']:.0f}s"
+        if last.get("deploy_seconds") is not None:
+            detail += f", deploy {last['deploy_seconds']:.0f}s"
+        lines.append(f"Build:        {detail}")
 
     lines.append("")
     lines.append("Recent runs:")
@@ -51,7 +77,7 @@ def format_status(db: PropagateDB) -> str:
         status = run["status"]
         eos = run.get("eos_new")
         eo_str = f"{eos} new EOs" if eos and eos > 0 else "no new EOs"
-        deployed = "deployed" if run.get("deployed") else ""
+        deployed = "deployed" if run.get("deployed") else run.get("skip_reason") or ""
         error = run.get("error") or ""
         if status == "failed":
             eo_str = error[:40] if error else "—"
@@ -62,7 +88,7 @@ def format_status(db: PropagateDB) -> str:
 
 
 def main():
-    db = PropagateDB()
+    db = PropagateDB(DB_PATH)
     print(format_status(db))
 
 
@@ -0,0 +1,80 @@
+import re
+from typing import Iterable
+
+# how much a match in each field counts towards a document's score. The long
+# prose fields (deeper_dive, the effects and impacts) are left out: they would
+# make the index about as large as the records it indexes, and the summary
+# already names what they discuss
+FIELD_WEIGHTS = {
+    "title": 8,
+    "summary": 4,
+    "key_industries": 3,
+    "categories.policy_domain": 3,
+    "categories.regulatory_impact": 2,
+    "categories.constitutional_authority": 2,
+    "categories.political_context": 2,
+    "purpose": 2,
+}
+
+# must match STOPWORDS in web/src/main.ts
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this "
+    "to was were will with".split()
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens of `text`, without stopwords or single letters."""
+    return [
+        token
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def _field_text(record: dict, field: str) -> str:
+    value = record
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, list):
+        return " ".join(map(str, value))
+    return str(value) if value is not None else ""
+
+
+def index_record(postings: dict[str, dict[int, int]], position: int, record: dict):
+    """Add the weighted terms of `record`, at `position` in the index, to `postings`."""
+    for field, weight in FIELD_WEIGHTS.items():
+        # a term counts once per field, however often the field repeats it
+        for token in set(tokenize(_field_text(record, field))):
+            scores = postings.setdefault(token, {})
+            scores[position] = scores.get(position, 0) + weight
+
+
+def finish_search_index(postings: dict[str, dict[int, int]]) -> dict:
+    """
+    Serialize `postings` into the search index the web frontend loads.
+
+    Each term maps to a flat list of [position, score, position, score, ...]
+    pairs, where position is the record's index in the "eos" list of
+    index.json and score is the sum of FIELD_WEIGHTS over the fields of that
+    record that contain the term. Terms are sorted so the output is stable
+    for the same records.
+    """
+    terms = {}
+    for term in sorted(postings):
+        flat = []
+        for position, score in sorted(postings[term].items()):
+            flat.extend((position, score))
+        terms[term] = flat
+
+    return {"terms": terms}
+
+
+def build_search_index(records: Iterable[dict]) -> dict:
+    """Build an inverted index over `records` for the web frontend."""
+    postings: dict[str, dict[int, int]] = {}
+    for position, record in enumerate(records):
+        index_record(postings, position, record)
+    return finish_search_index(postings)
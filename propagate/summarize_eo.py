@@ -2,28 +2,67 @@
 
 import json
 import sys
+import time
 import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Mapping, Optional, TypeVar
 
+import anthropic
 from anthropic.types.message import Message
 from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
 from anthropic.types.messages.batch_create_params import Request
 from anthropic.types.messages.message_batch import MessageBatch
-from propagate.config import MAX_TOKENS, MODEL
+from propagate.chunking import chunk_document, is_oversized, split_pdf
+from propagate.config import (
+    BATCH_MAX_BYTES,
+    BATCH_MAX_REQUESTS,
+    BATCH_SPOOL_DIR,
+    HTTP_TIMEOUT,
+    MAX_TOKENS,
+    MODEL,
+    PROMPT_CACHING,
+    STREAMING,
+    SUMMARY_MAX_ATTEMPTS,
+    SUMMARY_WORKERS,
+)
+from propagate.httpclient import get_session
 from propagate.logging_config import get_logger, setup_logging
 from propagate.models import ExecutiveOrder, Summary
-from propagate.prompts import PROMPT, SYSTEM_PROMPT_EXECUTIVE_ORDER
+from propagate.prompts import MERGE_PROMPT, PROMPT, SYSTEM_PROMPT_EXECUTIVE_ORDER
+from propagate.ratelimit import AdaptiveRateLimiter
+from propagate.response_cache import (
+    cache_response,
+    evict_responses,
+    get_cached_response,
+    response_key,
+)
+from propagate.uploads import FILES_API_BETA
 from propagate.util import (
     claude_json_to_summary,
     fetch_all_executive_orders,
     get_client,
-    get_pdf_data,
+    get_document,
     save_summary,
+    text_document,
 )
 
 logger = get_logger(__name__)
 
+UsageCallback = Callable[[ExecutiveOrder, dict], None]
+T = TypeVar("T")
+
+RATE_LIMIT_STATUSES = (429, 529)  # rate limited, overloaded
+BATCH_ENVELOPE_BYTES = len('{"requests": []}')
+BATCH_SUBMIT_WORKERS = 4
+
 
 def save_claude_json(json_data: dict, json_path: Path) -> Path:
     with open(json_path, "w") as f:
@@ -31,118 +70,513 @@ def save_claude_json(json_data: dict, json_path: Path) -> Path:
     return json_path
 
 
-def create_claude_message(order: ExecutiveOrder) -> Message | None:
+def save_claude_summary(order: ExecutiveOrder, claude_json: dict) -> Summary:
+    """Write both the raw Claude JSON and the Summary for an order."""
+    save_claude_json(claude_json, order.get_claude_json_path())
+    summary = claude_json_to_summary(claude_json, order)
+    saved_path = save_summary(summary, order.get_summary_path())
+    logger.info("Summary saved to %s", saved_path)
+    return summary
+
+
+def build_message_params(
+    document: dict, prompt_caching: bool = PROMPT_CACHING, prompt: str = PROMPT
+) -> dict:
     """
-    Create a Claude message for a given executive order.
+    Build the Messages API parameters shared by the sync and batch paths.
+
+    With prompt caching on, the system prompt and the instruction block are
+    marked cacheable. Together they form the static prefix of every request,
+    so only the document varies between EOs.
+    """
+    system = SYSTEM_PROMPT_EXECUTIVE_ORDER
+    instructions: dict = {"type": "text", "text": prompt}
+
+    if prompt_caching:
+        system = [
+            {
+                "type": "text",
+                "text": SYSTEM_PROMPT_EXECUTIVE_ORDER,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        instructions["cache_control"] = {"type": "ephemeral"}
+
+    return {
+        "model": MODEL,
+        "max_tokens": MAX_TOKENS,
+        "system": system,
+        "messages": [{"role": "user", "content": [instructions, document]}],
+    }
+
+
+def beta_headers(documents: Iterable[dict]) -> dict[str, str]:
+    """Beta headers required by the given document blocks."""
+    if any(d["source"]["type"] == "file" for d in documents):
+        return {"anthropic-beta": FILES_API_BETA}
+    return {}
+
+
+def _stream_message(
+    order: ExecutiveOrder, params: dict, extra_headers: dict[str, str]
+) -> tuple[Message, Mapping[str, str], dict]:
+    """
+    Stream a message and time it.
+
+    Returns the final message, the response headers and the time to first
+    token and output tokens per second.
     """
-    pdf_data = get_pdf_data(order)
+    started = time.monotonic()
+    first_token = None
+
+    with get_client().messages.stream(**params, extra_headers=extra_headers) as stream:
+        for event in stream:
+            if first_token is None and event.type == "content_block_delta":
+                first_token = time.monotonic()
+                logger.info(
+                    "EO %s: first token after %.1fs",
+                    order.executive_order_number, first_token - started,
+                )
+        message = stream.get_final_message()
+        headers = stream.response.headers
+
+    finished = time.monotonic()
+    first_token = first_token or finished
+    generating = finished - first_token
+    timing = {
+        "time_to_first_token": first_token - started,
+        "tokens_per_second": (
+            message.usage.output_tokens / generating if generating > 0 else None
+        ),
+    }
+    logger.info(
+        "EO %s: streamed %d output tokens in %.1fs",
+        order.executive_order_number, message.usage.output_tokens,
+        finished - started,
+    )
+    return message, headers, timing
 
-    # get size of pdf in bytes
-    # pdf should be less than 33554432 bytes
-    pdf_size = len(pdf_data)
 
-    if pdf_size > 33554432:
-        logger.error("PDF size is too large")
+def create_claude_message(
+    order: ExecutiveOrder,
+    limiter: AdaptiveRateLimiter | None = None,
+    document: dict | None = None,
+    prompt: str = PROMPT,
+    on_usage: UsageCallback | None = None,
+    stream: bool = STREAMING,
+) -> Message | None:
+    """
+    Create a Claude message for a given executive order.
+
+    API errors are raised to the caller. When a `limiter` is given, the
+    response's rate-limit headers are reported to it. `on_usage` is called
+    with the token usage, plus the time to first token and tokens per second
+    when the response is streamed.
+    """
+    if document is None:
+        document = get_document(order)
+
+    if is_oversized(document):
+        logger.error("Document for %s is too large for one request", order.pdf_path)
         return None
 
-    message: Message | None = None
+    params = build_message_params(document, prompt=prompt)
+    extra_headers = beta_headers([document])
+    timing = {}
     try:
-        # Create message with PDF attachment using file path
-        message = get_client().messages.create(
-            model=MODEL,
-            max_tokens=MAX_TOKENS,
-            system=SYSTEM_PROMPT_EXECUTIVE_ORDER,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": PROMPT},
-                        {
-                            "type": "document",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "application/pdf",
-                                "data": pdf_data,
-                            },
-                        },
-                    ],
-                }
-            ],
-        )
+        if stream:
+            message, headers, timing = _stream_message(order, params, extra_headers)
+        else:
+            # Create message with PDF attachment using file path
+            response = get_client().messages.with_raw_response.create(
+                **params, extra_headers=extra_headers
+            )
+            message, headers = response.parse(), response.headers
     except Exception as e:
-        logger.error("Error calling Claude API: %s", e)
-        sys.exit(1)
+        logger.error("Error calling Claude API for %s: %s", order.pdf_path, e)
+        raise
+
+    if limiter is not None:
+        limiter.on_success(headers)
+
+    if on_usage is not None:
+        on_usage(order, {**message.usage.model_dump(), **timing})
 
     return message
 
 
-def create_claude_batch_request(order: ExecutiveOrder, uid: str) -> tuple[Request, int]:
+def _retry_after(error: anthropic.APIStatusError) -> float | None:
+    value = error.response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _with_limiter(
+    call: Callable[[], T], limiter: AdaptiveRateLimiter, max_attempts: int
+) -> T:
+    """Run `call` in a limiter slot, retrying it after 429/529 responses."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with limiter:
+                return call()
+        except anthropic.APIStatusError as e:
+            if e.status_code not in RATE_LIMIT_STATUSES or attempt == max_attempts:
+                raise
+            limiter.on_rate_limited(_retry_after(e))
+    raise ValueError("max_attempts must be at least 1")
+
+
+def _limited_message(
+    order: ExecutiveOrder,
+    limiter: AdaptiveRateLimiter | None,
+    document: dict,
+    prompt: str = PROMPT,
+    on_usage: UsageCallback | None = None,
+    max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+) -> Message | None:
     """
-    Create a Claude message for a list of executive orders.
+    create_claude_message in a slot of `limiter`, retried after 429/529.
+
+    Every request takes a slot of its own, so only that request is retried
+    and the requests for the chunks of one order count against the limit
+    like the requests of separate orders.
+    """
+
+    def call() -> Message | None:
+        return create_claude_message(
+            order, limiter, document, prompt=prompt, on_usage=on_usage
+        )
+
+    if limiter is None:
+        return call()
+    return _with_limiter(call, limiter, max_attempts)
+
+
+def create_claude_batch_request(
+    order: ExecutiveOrder, uid: str, document: dict | None = None
+) -> tuple[Request, int]:
+    """
+    Create a Claude batch request for an executive order.
+
+    Returns the request and its JSON-encoded size in bytes.
     """
 
     logger.info("Creating batch request with uid %s", uid)
 
-    pdf_data = get_pdf_data(order)
-
-    # get size of pdf in bytes
-    pdf_size = int(len(pdf_data) / 1024 / 1024)  # convert to MB
-
-    return (
-        Request(
-            custom_id=uid,
-            params=MessageCreateParamsNonStreaming(
-                model=MODEL,
-                max_tokens=MAX_TOKENS,
-                system=SYSTEM_PROMPT_EXECUTIVE_ORDER,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": PROMPT},
-                            {
-                                "type": "document",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "application/pdf",
-                                    "data": pdf_data,
-                                },
-                            },
-                        ],
-                    }
-                ],
-            ),
-        ),
-        pdf_size,
+    if document is None:
+        document = get_document(order)
+
+    request = Request(
+        custom_id=uid,
+        params=MessageCreateParamsNonStreaming(**build_message_params(document)),
     )
 
+    # base64 needs no JSON escaping, so the encoded size is the size of the
+    # request without its data plus the length of the data itself
+    source = document["source"]
+    if source["type"] == "base64":
+        data = source["data"]
+        source["data"] = ""
+        size = len(json.dumps(request)) + len(data)
+        source["data"] = data
+    else:
+        size = len(json.dumps(request))
+
+    return request, size
+
+
+def batch_custom_id(president_key: str, eo_number: int, uid_suffix: str) -> str:
+    return f"eo-{president_key}-{eo_number}-{uid_suffix}"
+
+
+def parse_custom_id(custom_id: str) -> tuple[str, int]:
+    """Split a batch custom ID into its president key and EO number."""
+    # format: eo-{president_key...}-{eo_number}-{uuid8}
+    parts = custom_id.split("-")
+    return "-".join(parts[1:-2]), int(parts[-2])
+
+
+@dataclass
+class BatchJob:
+    """One logical batch job, possibly spread over several API batches."""
+
+    batches: list[MessageBatch]
+    request_ids: dict[str, list[str]]  # batch id -> custom ids
+    # custom id -> response cache key of the request
+    response_keys: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def batch_ids(self) -> list[str]:
+        return [batch.id for batch in self.batches]
+
+    @property
+    def all_request_ids(self) -> list[str]:
+        return [uid for ids in self.request_ids.values() for uid in ids]
+
+
+class _SpoolFile:
+    """JSONL file holding the requests of one batch until it is submitted."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.request_ids: list[str] = []
+        self.size = BATCH_ENVELOPE_BYTES
+        self.headers: dict[str, str] = {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w")
+
+    def fits(self, size: int, max_bytes: int, max_requests: int) -> bool:
+        return (
+            self.size + size + 1 <= max_bytes
+            and len(self.request_ids) < max_requests
+        )
+
+    def add(self, uid: str, line: str, size: int, headers: dict[str, str]):
+        self._file.write(line + "\n")
+        self.headers.update(headers)
+        self.request_ids.append(uid)
+        self.size += size + 1  # separating comma
+
+    def close(self):
+        self._file.close()
+
+
+def _iter_spool_body(spool_path: Path) -> Iterator[bytes]:
+    yield b'{"requests": ['
+    with open(spool_path, "rb") as f:
+        for index, line in enumerate(f):
+            if index:
+                yield b","
+            yield line.rstrip(b"\n")
+    yield b"]}"
+
+
+def _submit_spool(
+    spool_path: Path, count: int, extra_headers: dict[str, str]
+) -> MessageBatch:
+    """
+    Submit a spooled batch, streaming the request body from disk.
+
+    The SDK's batches.create needs every request in memory, so the body is
+    POSTed with chunked transfer encoding instead, one spooled request at a
+    time, with the client's auth and version headers. The spool file is
+    removed whether or not the batch is created.
+    """
+    logger.info("Creating batch with %d requests from %s", count, spool_path)
+    client = get_client()
+    try:
+        response = get_session().post(
+            f"{str(client.base_url).rstrip('/')}/v1/messages/batches",
+            data=_iter_spool_body(spool_path),
+            headers={**client.default_headers, **extra_headers},
+            timeout=HTTP_TIMEOUT,
+        )
+        response.raise_for_status()
+        return MessageBatch.model_validate(response.json())
+    finally:
+        spool_path.unlink(missing_ok=True)
+
+
+class BatchSubmitError(Exception):
+    """
+    Submitting a batch job failed partway through.
+
+    `job` holds the batches that were created before the failure. They are
+    billed and will produce results, so callers should record them.
+    """
+
+    def __init__(self, job: "BatchJob"):
+        super().__init__(
+            f"Batch submission failed after creating {len(job.batches)} batches"
+        )
+        self.job = job
+
 
 def batch_summarize_with_claude(
-    orders: list[ExecutiveOrder],
+    orders: Iterable[ExecutiveOrder],
     president_key: str,
-) -> tuple[MessageBatch, list[str]]:
+    max_bytes: int = BATCH_MAX_BYTES,
+    max_requests: int = BATCH_MAX_REQUESTS,
+    on_usage: UsageCallback | None = None,
+) -> BatchJob | None:
     """
-    Batch summarize a list of executive orders with Claude API.
+    Batch summarize executive orders with Claude API.
+
+    Each request is written to a JSONL spool file under BATCH_SPOOL_DIR as
+    soon as it is built, so peak memory stays at about one document however
+    large the job is. Spool files are capped at the per-batch size and count
+    limits; each one is submitted in the background as soon as it is full,
+    while later requests are still being built. `orders` may be a lazy
+    stream.
+
+    Orders whose response is already in the response cache are summarized
+    from the cache instead of being submitted. Orders too large for one
+    request are summarized in chunks with the Messages API, throttled by an
+    AdaptiveRateLimiter, and `on_usage` is called with each response's token
+    usage.
+
+    Returns None when there is nothing to submit. If building requests or
+    creating any batch fails, every submission still in flight is waited on
+    and BatchSubmitError is raised with the batches that were created.
     """
 
     # uid must be less than 8 characters
     uid_suffix = str(uuid.uuid4())[:8]
-    client = get_client()
-    requests = []
-    request_ids = []
-    for order in orders:
-        uid = f"eo-{president_key}-{order.executive_order_number}-{uid_suffix}"
-        request, _ = create_claude_batch_request(order, uid)
-        if request is not None:
-            requests.append(request)
-            request_ids.append(uid)
+    limiter = AdaptiveRateLimiter(SUMMARY_WORKERS)
+
+    submitted: list[tuple[Future, list[str]]] = []
+    spool: _SpoolFile | None = None
+    response_keys: dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=BATCH_SUBMIT_WORKERS) as executor:
+
+        def submit(full: _SpoolFile):
+            full.close()
+            future = executor.submit(
+                _submit_spool, full.path, len(full.request_ids), full.headers
+            )
+            submitted.append((future, full.request_ids))
+
+        error = None
+        try:
+            for order in orders:
+                document = get_document(order)
+                key = response_key(document)
+                cached = get_cached_response(key)
+                if cached is not None:
+                    logger.info(
+                        "Response cache hit for EO %s, skipping batch request",
+                        order.executive_order_number,
+                    )
+                    save_claude_summary(order, cached)
+                    continue
+
+                if is_oversized(document, order.pdf_path):
+                    logger.info(
+                        "EO %s is too large for a batch request, summarizing it"
+                        " in chunks instead",
+                        order.executive_order_number,
+                    )
+                    try:
+                        summary_json = summarize_in_chunks(order, limiter, on_usage)
+                        cache_response(key, summary_json)
+                        save_claude_summary(order, summary_json)
+                    except Exception as e:
+                        logger.error(
+                            "Error summarizing EO %s in chunks: %s",
+                            order.executive_order_number, e,
+                        )
+                    continue
+
+                uid = batch_custom_id(
+                    president_key, order.executive_order_number, uid_suffix
+                )
+                response_keys[uid] = key
+                request, size = create_claude_batch_request(order, uid, document)
+
+                if spool is not None and not spool.fits(size, max_bytes, max_requests):
+                    submit(spool)
+                    spool = None
+                if spool is None:
+                    spool = _SpoolFile(
+                        BATCH_SPOOL_DIR / f"{uid_suffix}-{len(submitted)}.jsonl"
+                    )
+
+                spool.add(uid, json.dumps(request), size, beta_headers([document]))
+                # release the encoded PDF before waiting on the next order
+                del request, document
+
+            if spool is not None:
+                submit(spool)
+                spool = None
+        except Exception as e:
+            # batches already submitted must still be collected and recorded
+            error = e
+        finally:
+            if spool is not None:
+                # never submitted, so its requests are not needed again
+                spool.close()
+                spool.path.unlink(missing_ok=True)
+
+        job = BatchJob(batches=[], request_ids={})
+        for future, ids in submitted:
+            try:
+                batch = future.result()
+            except Exception as e:
+                logger.error("Failed to create a batch of %d requests: %s", len(ids), e)
+                error = error or e
+                continue
+            job.batches.append(batch)
+            job.request_ids[batch.id] = ids
+            job.response_keys.update((uid, response_keys[uid]) for uid in ids)
+
+        if error is not None:
+            raise BatchSubmitError(job) from error
+        if not submitted:
+            return None
+
+    logger.info(
+        "Submitted %d requests in %d batches: %s",
+        len(job.all_request_ids), len(job.batches), ", ".join(job.batch_ids),
+    )
+    return job
 
-    logger.info("Creating batch with %d requests", len(requests))
-    response = client.messages.batches.create(requests=requests)
-    return response, request_ids
 
+def summarize_in_chunks(
+    order: ExecutiveOrder,
+    limiter: AdaptiveRateLimiter | None = None,
+    on_usage: UsageCallback | None = None,
+    max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+) -> dict:
+    """
+    Map-reduce summarization for PDFs too large for one request.
 
-def summarize_with_claude(order: ExecutiveOrder) -> Summary | None:
+    The PDF is split into page ranges that each fit in a request and the
+    ranges are summarized concurrently. One more request merges the partial
+    summaries into the same JSON schema as a single-pass summary. Each
+    request takes its own `limiter` slot and is retried on its own after a
+    429/529, so chunks that were already summarized are not requested again.
+    """
+    chunks = split_pdf(Path(order.pdf_path))
+    logger.info(
+        "Summarizing EO %s in %d page ranges",
+        order.executive_order_number, len(chunks),
+    )
+
+    def summarize_chunk(chunk) -> dict:
+        message = _limited_message(
+            order, limiter, chunk_document(chunk), on_usage=on_usage,
+            max_attempts=max_attempts,
+        )
+        if message is None:
+            raise ValueError(
+                f"Pages {chunk.start_page}-{chunk.end_page} of {order.pdf_path}"
+                " are too large for one request"
+            )
+        return json.loads(message.content[0].text)
+
+    with ThreadPoolExecutor(max_workers=min(len(chunks), SUMMARY_WORKERS)) as executor:
+        partials = list(executor.map(summarize_chunk, chunks))
+
+    merge_input = "\n\n".join(
+        f"Pages {chunk.start_page}-{chunk.end_page}:\n{json.dumps(partial, indent=2)}"
+        for chunk, partial in zip(chunks, partials)
+    )
+    message = _limited_message(
+        order, limiter, text_document(merge_input), prompt=MERGE_PROMPT,
+        on_usage=on_usage, max_attempts=max_attempts,
+    )
+    return json.loads(message.content[0].text)
+
+
+def summarize_with_claude(
+    order: ExecutiveOrder,
+    limiter: AdaptiveRateLimiter | None = None,
+    on_usage: UsageCallback | None = None,
+    max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+) -> Summary | None:
     """
     Send PDF file to Claude API for summarization.
 
@@ -153,19 +587,39 @@ def summarize_with_claude(order: ExecutiveOrder) -> Summary | None:
         Dictionary with summary and metadata
     """
 
-    message = create_claude_message(order)
-    if message is None:
-        logger.error("Error summarizing %s", order.pdf_path)
-        return None
+    document = get_document(order)
+    key = response_key(document)
+
+    summary_json = get_cached_response(key)
+    if summary_json is not None:
+        logger.info("Response cache hit for EO %s", order.executive_order_number)
+        save_claude_json(summary_json, order.get_claude_json_path())
+        return summary_json
+
+    if is_oversized(document, order.pdf_path):
+        summary_json = summarize_in_chunks(order, limiter, on_usage, max_attempts)
+    else:
+        message = _limited_message(
+            order, limiter, document, on_usage=on_usage, max_attempts=max_attempts
+        )
+        if message is None:
+            logger.error("Error summarizing %s", order.pdf_path)
+            return None
+        summary_json = json.loads(message.content[0].text)
 
-    summary = message.content[0].text
-    summary_json = json.loads(summary)
+    cache_response(key, summary_json)
     save_claude_json(summary_json, order.get_claude_json_path())
 
     return summary_json
 
 
-def process_pdf(order: ExecutiveOrder, force: bool = False) -> Optional[Summary]:
+def process_pdf(
+    order: ExecutiveOrder,
+    force: bool = False,
+    limiter: AdaptiveRateLimiter | None = None,
+    on_usage: UsageCallback | None = None,
+    max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+) -> Optional[Summary]:
     summary_path = order.get_summary_path()
 
     # Skip if summary already exists
@@ -175,7 +629,7 @@ def process_pdf(order: ExecutiveOrder, force: bool = False) -> Optional[Summary]
     logger.info("Processing %s...", order.pdf_path)
 
     # Summarize with Claude using the PDF file directly
-    summary_data = summarize_with_claude(order)
+    summary_data = summarize_with_claude(order, limiter, on_usage, max_attempts)
     if summary_data is None:
         raise Exception(f"Error summarizing {order.pdf_path}")
 
@@ -190,6 +644,80 @@ def process_pdf(order: ExecutiveOrder, force: bool = False) -> Optional[Summary]
     return summary
 
 
+@dataclass
+class SummaryResult:
+    order: ExecutiveOrder
+    status: str
+    error: str | None = None
+
+
+def _summarize_order(
+    order: ExecutiveOrder,
+    force: bool,
+    limiter: AdaptiveRateLimiter,
+    max_attempts: int,
+    on_usage: UsageCallback | None,
+) -> SummaryResult:
+    try:
+        process_pdf(order, force, limiter, on_usage, max_attempts)
+        return SummaryResult(order, "success")
+    except Exception as e:
+        return SummaryResult(order, "failed", str(e))
+
+
+def summarize_orders(
+    orders: Iterable[ExecutiveOrder],
+    force: bool = False,
+    workers: int = SUMMARY_WORKERS,
+    max_attempts: int = SUMMARY_MAX_ATTEMPTS,
+    on_usage: UsageCallback | None = None,
+) -> list[SummaryResult]:
+    """
+    Summarize orders concurrently with the synchronous Messages API.
+
+    Up to `workers` requests run at once, throttled by an
+    AdaptiveRateLimiter that backs off on 429/529 responses. A failure only
+    affects its own order; every order gets a SummaryResult. `on_usage` is
+    called with each response's token usage.
+    """
+    limiter = AdaptiveRateLimiter(workers)
+    results = []
+
+    def collect(futures):
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            if result.status == "success":
+                logger.info("EO %s: success", result.order.executive_order_number)
+            else:
+                logger.error(
+                    "EO %s: failed - %s",
+                    result.order.executive_order_number, result.error,
+                )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = set()
+        for order in orders:
+            pending.add(
+                executor.submit(
+                    _summarize_order, order, force, limiter, max_attempts, on_usage
+                )
+            )
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(as_completed(pending))
+
+    evict_responses()
+
+    failed = [r for r in results if r.status != "success"]
+    logger.info(
+        "Summarized %d/%d EOs, %d failed",
+        len(results) - len(failed), len(results), len(failed),
+    )
+    return results
+
+
 def main():
     """Summarizes the EO based on the executive order number"""
     setup_logging()
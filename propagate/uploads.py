@@ -0,0 +1,51 @@
+import threading
+from pathlib import Path
+
+from propagate.config import DB_PATH
+from propagate.db import PropagateDB
+from propagate.httpclient import sha256_file
+from propagate.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FILES_API_BETA = "files-api-2025-04-14"
+
+_db: PropagateDB | None = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> PropagateDB:
+    global _db
+
+    with _db_lock:
+        if _db is None:
+            _db = PropagateDB(DB_PATH)
+    return _db
+
+
+def file_document(file_id: str) -> dict:
+    return {"type": "document", "source": {"type": "file", "file_id": file_id}}
+
+
+def upload_pdf(client, pdf_path: Path, db: PropagateDB | None = None) -> str:
+    """
+    Upload a PDF through the Files API unless its content was uploaded before.
+
+    Uploads are keyed by the PDF's SHA-256, so re-downloaded but unchanged
+    PDFs reuse the existing file ID.
+    """
+    db = db or get_db()
+    sha256 = sha256_file(pdf_path)
+
+    file_id = db.get_file_id(sha256)
+    if file_id:
+        return file_id
+
+    logger.info("Uploading %s to the Files API", pdf_path)
+    with open(pdf_path, "rb") as f:
+        uploaded = client.beta.files.upload(
+            file=(pdf_path.name, f, "application/pdf"), betas=[FILES_API_BETA]
+        )
+
+    db.record_file(sha256, uploaded.id, pdf_path.name, pdf_path.stat().st_size)
+    return uploaded.id
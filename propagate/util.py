@@ -4,10 +4,12 @@ import sys
 from pathlib import Path
 
 import anthropic
-from propagate.config import CLAUDE_API_KEY
+from propagate.config import ANTHROPIC_BASE_URL, CLAUDE_API_KEY, SOURCE_MODE
 from propagate.federalregister import fetch_all_executive_orders
+from propagate.fulltext import fetch_full_text
 from propagate.logging_config import get_logger
 from propagate.models import Categories, ExecutiveOrder, Summary
+from propagate.uploads import file_document, upload_pdf
 
 logger = get_logger(__name__)
 
@@ -25,7 +27,9 @@ def get_client():
         sys.exit(1)
 
     if client is None:
-        client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
+        client = anthropic.Anthropic(
+            api_key=CLAUDE_API_KEY, base_url=ANTHROPIC_BASE_URL
+        )
     return client
 
 
@@ -65,6 +69,57 @@ def get_pdf_data(order: ExecutiveOrder) -> str:
         return base64.standard_b64encode(f.read()).decode("utf-8")
 
 
+def pdf_document(pdf_data: str) -> dict:
+    return {
+        "type": "document",
+        "source": {
+            "type": "base64",
+            "media_type": "application/pdf",
+            "data": pdf_data,
+        },
+    }
+
+
+def text_document(text: str) -> dict:
+    return {
+        "type": "document",
+        "source": {
+            "type": "text",
+            "media_type": "text/plain",
+            "data": text,
+        },
+    }
+
+
+def get_document(order: ExecutiveOrder, source_mode: str = SOURCE_MODE) -> dict:
+    """
+    Build the document content block sent to Claude for an order.
+
+    In "text" mode the Federal Register full text is sent as plain text,
+    which is far smaller than the base64 PDF; the PDF is the fallback when
+    no text is available. In "file" mode the PDF is uploaded once through
+    the Files API and referenced by its file ID.
+    """
+    if source_mode == "text":
+        text = fetch_full_text(order)
+        if text:
+            return text_document(text)
+        logger.info(
+            "No full text for EO %s, falling back to PDF", order.executive_order_number
+        )
+
+    if source_mode == "file":
+        try:
+            return file_document(upload_pdf(get_client(), Path(order.pdf_path)))
+        except Exception as e:
+            logger.error(
+                "Error uploading EO %s, sending it inline: %s",
+                order.executive_order_number, e,
+            )
+
+    return pdf_document(get_pdf_data(order))
+
+
 def save_summary(summary: Summary, summary_path: Path) -> Path:
     """
     Save the summary to a JSON file.
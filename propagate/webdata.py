@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Iterable
+
+from propagate.logging_config import get_logger
+from propagate.models import PRESIDENTS
+from propagate.search_index import finish_search_index, index_record
+
+try:
+    import brotli
+except ImportError:  # optional, see the "compression" extra
+    brotli = None
+
+logger = get_logger(__name__)
+
+# fields the web frontend needs to render the list before any details load
+INDEX_FIELDS = [
+    "eo_number",
+    "title",
+    "signing_date",
+    "effective_date",
+    "expiration_date",
+    "president",
+    "summary",
+    "original_url",
+    "timestamp",
+    "categories",
+]
+
+
+def shard_id(record: dict) -> str:
+    """Detail shard holding `record`: one per president and signing year."""
+    names = {p.name: p.key for p in PRESIDENTS}
+    president = record.get("president") or "unknown"
+    key = names.get(president) or re.sub(r"[^a-z0-9]+", "-", president.lower())
+    year = str(record.get("signing_date") or "")[:4] or "unknown"
+    return f"{key.strip('-')}-{year}"
+
+
+def compress_file(path: Path):
+    """Write .gz and, when brotli is installed, .br copies next to `path`."""
+    data = path.read_bytes()
+    # mtime=0 keeps the gzip output identical for identical input
+    path.with_name(path.name + ".gz").write_bytes(
+        gzip.compress(data, compresslevel=9, mtime=0)
+    )
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data))
+
+
+def write_artifact(path: Path, data: bytes) -> bool:
+    """
+    Write `data` and its compressed copies unless `path` already holds it.
+
+    Returns whether anything was written.
+    """
+    compressed = [path.with_name(path.name + ".gz")]
+    if brotli is not None:
+        compressed.append(path.with_name(path.name + ".br"))
+
+    if (
+        path.exists()
+        and all(p.exists() for p in compressed)
+        and path.read_bytes() == data
+    ):
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    compress_file(path)
+    return True
+
+
+def _without_build_time(data: bytes) -> bytes:
+    value = json.loads(data)
+    if not isinstance(value, dict) or "build_time" not in value:
+        return data
+    del value["build_time"]
+    return json.dumps(value, sort_keys=True).encode("utf-8")
+
+
+def content_hash(sources: Iterable[Path], data: Iterable[Path] = ()) -> str:
+    """
+    Hash the files at `sources` and `data`, descending into directories.
+
+    Source files are hashed as they are. JSON files under `data` are built
+    output, so their top-level "build_time" key is left out and two builds
+    of the same records hash the same. Compressed copies are skipped since
+    they follow from the files they compress.
+    """
+    files = []
+    for paths, generated in ((sources, False), (data, True)):
+        for path in paths:
+            found = sorted(path.rglob("*")) if path.is_dir() else [path]
+            files.extend((file, generated) for file in found)
+
+    digest = hashlib.sha256()
+    for file, generated in files:
+        if not file.is_file() or file.suffix in (".gz", ".br"):
+            continue
+        contents = file.read_bytes()
+        if generated and file.suffix == ".json":
+            contents = _without_build_time(contents)
+        digest.update(file.as_posix().encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(contents).digest())
+    return digest.hexdigest()
+
+
+def _write_shard(
+    details_dir: Path, shard: str, records: list[dict], flushed: set[str]
+) -> bool:
+    path = details_dir / f"{shard}.json"
+    if shard in flushed:
+        # EO numbers follow signing dates, so a shard's records are normally
+        # consecutive; if not, extend what was written earlier in this build
+        records = json.loads(path.read_text())["eos"] + records
+    flushed.add(shard)
+    return write_artifact(path, json.dumps({"eos": records}).encode("utf-8"))
+
+
+def write_web_data(records: Iterable[dict], out_dir: Path, build_time: str):
+    """
+    Write the files the web frontend loads.
+
+    index.json holds only the INDEX_FIELDS of every record, plus the detail
+    shard each one lives in, so the first paint stays small. Full records
+    are split into details/<president>-<year>.json shards that are fetched
+    on demand. Shards whose content did not change are left untouched, and
+    shards that no longer have records are removed. search.json is an
+    inverted index over the full records, so the frontend can search
+    without building an index of its own.
+
+    `records` is read once, in EO number order, and only the records of
+    the shard being collected are kept in full.
+    """
+    details_dir = out_dir / "details"
+    index = []
+    postings: dict[str, dict[int, int]] = {}
+    flushed: set[str] = set()
+    changed: set[str] = set()
+    current, current_records = None, []
+
+    started = time.monotonic()
+    for record in records:
+        shard = shard_id(record)
+        if shard != current:
+            if current_records and _write_shard(
+                details_dir, current, current_records, flushed
+            ):
+                changed.add(current)
+            current, current_records = shard, []
+        current_records.append(record)
+
+        slim = {field: record.get(field) for field in INDEX_FIELDS}
+        slim["shard"] = shard
+        index_record(postings, len(index), record)
+        index.append(slim)
+
+    if current_records and _write_shard(
+        details_dir, current, current_records, flushed
+    ):
+        changed.add(current)
+
+    if details_dir.exists():
+        for path in details_dir.glob("*.json"):
+            if path.stem not in flushed:
+                for stale in path.parent.glob(f"{path.name}*"):
+                    stale.unlink()
+
+    index_json = {"eos": index, "build_time": build_time}
+    write_artifact(out_dir / "index.json", json.dumps(index_json).encode("utf-8"))
+
+    search_index = finish_search_index(postings)
+    data = json.dumps(search_index, separators=(",", ":")).encode("utf-8")
+    write_artifact(out_dir / "search.json", data)
+
+    logger.info(
+        "Wrote index of %d EOs, %d/%d changed detail shards and a search index"
+        " of %d terms (%d bytes) to %s in %.2fs",
+        len(index), len(changed), len(flushed), len(search_index["terms"]),
+        len(data), out_dir, time.monotonic() - started,
+    )
@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate.batch_manager import download_and_process_batch
+from propagate.db import PropagateDB
+
+
+def _result(custom_id: str, text: str) -> dict:
+    return {
+        "custom_id": custom_id,
+        "result": {
+            "type": "succeeded",
+            "message": {
+                "id": "msg_1", "type": "message", "role": "assistant",
+                "model": "claude", "stop_reason": "end_turn", "stop_sequence": None,
+                "content": [{"type": "text", "text": text}],
+                "usage": {"input_tokens": 10, "output_tokens": 20},
+            },
+        },
+    }
+
+
+class _BatchHandler(BaseHTTPRequestHandler):
+    """Minimal local stand-in for batch retrieval and the results endpoint."""
+
+    results = [_result(f"eo-donald-trump-{n}-abcd1234", "{}") for n in (14405, 14406)]
+    downloads = 0
+
+    def do_GET(self):
+        if self.path.endswith("/results"):
+            type(self).downloads += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.end_headers()
+            for result in self.results:
+                self.wfile.write(json.dumps(result).encode() + b"\n")
+                self.wfile.flush()
+            return
+
+        host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        payload = json.dumps({
+            "id": "msgbatch_1",
+            "type": "message_batch",
+            "processing_status": "ended",
+            "created_at": "2026-01-20T00:00:00Z",
+            "expires_at": "2026-01-21T00:00:00Z",
+            "ended_at": "2026-01-20T01:00:00Z",
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "request_counts": {
+                "canceled": 0, "errored": 0, "expired": 0,
+                "processing": 0, "succeeded": 2,
+            },
+            "results_url": f"{host}/v1/messages/batches/msgbatch_1/results",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_batch_results_are_processed_while_streaming_to_disk(serve):
+    base_url = serve(_BatchHandler)
+    seen = []
+
+    def fake_build(entries, on_result=None, **kwargs):
+        for entry in entries:
+            # the file only takes its final name once the stream is read
+            assert not Path("batch_results/batch_msgbatch_1.jsonl").exists()
+            seen.append(entry["custom_id"])
+            on_result(entry["custom_id"], "succeeded")
+        return []
+
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            with (
+                patch("propagate.util.client", None),
+                patch("propagate.util.CLAUDE_API_KEY", "test-key"),
+                patch("propagate.util.ANTHROPIC_BASE_URL", base_url),
+                patch("propagate.batch_manager.build_from_batch_results", fake_build),
+            ):
+                failed = download_and_process_batch("msgbatch_1")
+
+            lines = Path("batch_results/batch_msgbatch_1.jsonl").read_text()
+    finally:
+        os.chdir(cwd)
+
+    assert failed == []
+    assert seen == ["eo-donald-trump-14405-abcd1234", "eo-donald-trump-14406-abcd1234"]
+    entries = [json.loads(line) for line in lines.splitlines()]
+    assert [e["custom_id"] for e in entries] == seen
+    assert entries[0]["result"]["message"]["content"][0]["text"] == "{}"
+
+
+def test_processing_resumes_and_skips_applied_results(serve):
+    _BatchHandler.downloads = 0
+    base_url = serve(_BatchHandler)
+    applied = []
+
+    def interrupted_build(entries, on_result=None, **kwargs):
+        for entry in entries:
+            applied.append(entry["custom_id"])
+            on_result(entry["custom_id"], "succeeded")
+            raise KeyboardInterrupt
+
+    def fake_build(entries, on_result=None, **kwargs):
+        for entry in entries:
+            applied.append(entry["custom_id"])
+            on_result(entry["custom_id"], "errored")
+        return []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with (
+                patch("propagate.util.client", None),
+                patch("propagate.util.CLAUDE_API_KEY", "test-key"),
+                patch("propagate.util.ANTHROPIC_BASE_URL", base_url),
+            ):
+                with patch(
+                    "propagate.batch_manager.build_from_batch_results",
+                    interrupted_build,
+                ):
+                    try:
+                        download_and_process_batch("msgbatch_1", db=db)
+                    except KeyboardInterrupt:
+                        pass
+                with patch(
+                    "propagate.batch_manager.build_from_batch_results", fake_build
+                ):
+                    failed = download_and_process_batch("msgbatch_1", db=db)
+                    again = download_and_process_batch("msgbatch_1", db=db)
+        finally:
+            os.chdir(cwd)
+
+        batch = db.get_batches()[0]
+
+    assert applied == [
+        "eo-donald-trump-14405-abcd1234", "eo-donald-trump-14406-abcd1234",
+    ]
+    assert failed == again == ["eo-donald-trump-14406-abcd1234"]
+    assert _BatchHandler.downloads == 2
+    assert batch["status"] == "ended"
+    assert (batch["succeeded"], batch["failed"]) == (1, 1)
+    assert batch["processed_at"] is not None
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from propagate.batch_watcher import BatchWatcher
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _status(status: str, processing: int, succeeded: int):
+    return SimpleNamespace(
+        processing_status=status,
+        ended_at=None,
+        request_counts=SimpleNamespace(
+            processing=processing, succeeded=succeeded,
+            errored=0, canceled=0, expired=0,
+        ),
+    )
+
+
+def _client(statuses: dict[str, list]) -> MagicMock:
+    client = MagicMock()
+    client.messages.batches.retrieve.side_effect = (
+        lambda batch_id: statuses[batch_id].pop(0)
+    )
+    return client
+
+
+def test_watch_yields_each_batch_as_it_ends_and_backs_off():
+    fake_time = _FakeTime()
+    client = _client({
+        "msgbatch_a": [_status("in_progress", 10, 0), _status("ended", 0, 10)],
+        "msgbatch_b": [
+            _status("in_progress", 100, 0),
+            _status("in_progress", 100, 0),
+            _status("in_progress", 100, 0),
+            _status("ended", 0, 100),
+        ],
+    })
+
+    with (
+        patch("propagate.batch_watcher.time", fake_time),
+        patch("propagate.batch_watcher.get_client", return_value=client),
+    ):
+        watcher = BatchWatcher(
+            ["msgbatch_a", "msgbatch_b"], timeout=600,
+            min_interval=5, max_interval=60, backoff=2,
+        )
+        ended = list(watcher.watch())
+
+    assert ended == ["msgbatch_a", "msgbatch_b"]
+    assert fake_time.sleeps == [5, 10, 20]
+    assert watcher.polls == 6
+    assert watcher.elapsed == 35
+    assert watcher.detect_seconds == 20
+
+
+def test_watch_polls_again_by_the_estimated_completion():
+    fake_time = _FakeTime()
+    client = _client({
+        "msgbatch_a": [
+            _status("in_progress", 100, 0),
+            _status("in_progress", 50, 50),
+            _status("ended", 0, 100),
+        ],
+    })
+
+    with (
+        patch("propagate.batch_watcher.time", fake_time),
+        patch("propagate.batch_watcher.get_client", return_value=client),
+    ):
+        watcher = BatchWatcher(
+            ["msgbatch_a"], timeout=600, min_interval=10, max_interval=120, backoff=4,
+        )
+        list(watcher.watch())
+
+    # 50 requests in 10s leaves an ETA of 10s, well under the 40s backoff
+    assert fake_time.sleeps == [10, 10]
+
+
+def test_watch_times_out_on_pending_batches():
+    fake_time = _FakeTime()
+    client = MagicMock()
+    client.messages.batches.retrieve.return_value = _status("in_progress", 10, 0)
+
+    with (
+        patch("propagate.batch_watcher.time", fake_time),
+        patch("propagate.batch_watcher.get_client", return_value=client),
+    ):
+        watcher = BatchWatcher(["msgbatch_a"], timeout=30, min_interval=10, backoff=1)
+        with pytest.raises(TimeoutError):
+            list(watcher.watch())
+
+    assert watcher.elapsed == 30
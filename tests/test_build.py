@@ -0,0 +1,223 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate.build import (
+    build_from_batch_results,
+    build_from_summaries,
+    normalize_summary,
+    sync_summary_manifest,
+    write_eo_json,
+)
+from propagate.db import PropagateDB
+from propagate.models import ExecutiveOrder
+
+CATEGORIES = [
+    "policy_domain", "regulatory_impact", "constitutional_authority", "duration",
+    "scope_of_impact", "political_context", "legal_framework",
+    "budgetary_implications", "implementation_timeline", "precedential_value",
+]
+FIELDS = [
+    "summary", "purpose", "effective_date", "expiration_date", "economic_effects",
+    "geopolitical_effects", "deeper_dive", "positive_impacts", "negative_impacts",
+    "key_industries",
+]
+
+
+def _entry(custom_id: str, text: str | None = None) -> dict:
+    if text is None:
+        claude_json = {field: "x" for field in FIELDS}
+        claude_json["categories"] = {category: "y" for category in CATEGORIES}
+        text = json.dumps(claude_json)
+    return {
+        "custom_id": custom_id,
+        "result": {
+            "type": "succeeded",
+            "message": {
+                "content": [{"type": "text", "text": text}],
+                "usage": {"input_tokens": 1, "output_tokens": 2},
+            },
+        },
+    }
+
+
+def _record(eo_number: int) -> dict:
+    return {
+        "document_number": f"2021-{eo_number}",
+        "executive_order_number": eo_number,
+        "title": f"EO {eo_number}",
+        "signing_date": "2021-01-20",
+        "html_url": f"https://example.com/{eo_number}",
+    }
+
+
+@patch("propagate.build.sync_eo_metadata")
+def test_build_from_batch_results_looks_up_each_president(mock_sync):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        db.upsert_catalog("joe-biden", [_record(14000), _record(14001)])
+
+        def sync(db, president):
+            if president == "joe-biden":
+                db.upsert_catalog("joe-biden", [_record(14002)])
+            return [ExecutiveOrder.from_dict(d) for d in db.get_catalog(president)]
+
+        mock_sync.side_effect = sync
+        usage = []
+
+        with (
+            patch("propagate.models.SUMMARIES_DIR", Path(tmp)),
+            patch.dict("os.environ", {"PROPAGATE_SUMMARIES_DIR": tmp}),
+            patch("propagate.build.cache_response") as mock_cache,
+        ):
+            failed = build_from_batch_results(
+                [
+                    _entry("eo-joe-biden-14001-abcd1234"),
+                    _entry("eo-joe-biden-14000-abcd1234", text="not json"),
+                    _entry("eo-joe-biden-14999-abcd1234"),
+                    _entry("eo-joe-biden-14002-abcd1234"),
+                    _entry("eo-donald-trump-14405-abcd1234"),
+                ],
+                on_usage=lambda order, u: usage.append(order.executive_order_number),
+                db=db,
+                response_keys={"eo-joe-biden-14001-abcd1234": "key-14001"},
+            )
+
+        summary = json.loads((Path(tmp) / "EO-14001.json").read_text())
+
+    assert summary["president"] == "Joseph R. Biden Jr."
+    assert failed == [
+        "eo-joe-biden-14000-abcd1234",
+        "eo-joe-biden-14999-abcd1234",
+        "eo-donald-trump-14405-abcd1234",
+    ]
+    assert usage == [14001, 14000, 14002]
+    # only results whose request key was recorded at submission are cached
+    assert [c.args[0] for c in mock_cache.call_args_list] == ["key-14001"]
+    # joe-biden's catalog is synced once when it lacks an EO, and donald-trump
+    # has no catalog yet
+    assert [c.kwargs["president"] for c in mock_sync.call_args_list] == [
+        "joe-biden", "donald-trump",
+    ]
+
+
+def test_parallel_post_processing_matches_inline_output():
+    entries = [_entry(f"eo-joe-biden-{n}-abcd1234") for n in range(14000, 14012)]
+    entries[3] = _entry("eo-joe-biden-14003-abcd1234", text="{truncated")
+    outputs = []
+
+    for workers in (1, 3):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = PropagateDB(Path(tmp) / "test.db")
+            db.upsert_catalog("joe-biden", [_record(n) for n in range(14000, 14012)])
+
+            with (
+                patch("propagate.models.SUMMARIES_DIR", Path(tmp)),
+                patch.dict("os.environ", {"PROPAGATE_SUMMARIES_DIR": tmp}),
+            ):
+                failed = build_from_batch_results(entries, db=db, workers=workers)
+
+            files = {
+                path.name: path.read_text()
+                for path in sorted(Path(tmp).glob("EO-*.json"))
+            }
+            outputs.append((failed, files))
+
+    assert outputs[0] == outputs[1]
+    failed, files = outputs[1]
+    assert failed == ["eo-joe-biden-14003-abcd1234"]
+    assert len(files) == 22
+
+
+def _summary(eo_number: int, title: str) -> dict:
+    return {
+        "eo_number": eo_number,
+        "title": title,
+        "summary": "x",
+        "effective_date": "January 20, 2025",
+        "expiration_date": "Not specified",
+        "signing_date": "2025-01-20",
+    }
+
+
+def test_build_from_summaries_reparses_only_changed_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        eo_dir = Path(tmp) / "eo"
+        eo_dir.mkdir()
+        for n in (14001, 14002, 14003):
+            (eo_dir / f"EO-{n}.json").write_text(json.dumps(_summary(n, f"EO {n}")))
+        (eo_dir / "EO-14001-claude.json").write_text("{}")
+        db = PropagateDB(Path(tmp) / "test.db")
+
+        def build() -> list[dict]:
+            with (
+                patch.dict("os.environ", {"PROPAGATE_SUMMARIES_DIR": str(eo_dir)}),
+                patch(
+                    "propagate.build.normalize_summary", wraps=normalize_summary
+                ) as normalize,
+            ):
+                cwd = os.getcwd()
+                os.chdir(tmp)
+                try:
+                    build_from_summaries(db)
+                finally:
+                    os.chdir(cwd)
+            builds.append(normalize.call_count)
+            return json.loads((eo_dir / "eo.json").read_text())["eos"]
+
+        builds = []
+        eos = build()
+        assert [eo["eo_number"] for eo in eos] == [14003, 14002, 14001]
+        assert eos[0]["effective_date"] == "2025-01-20"
+        assert eos[0]["expiration_date"] == "No expiration date stated"
+
+        build()
+        (eo_dir / "EO-14002.json").write_text(json.dumps(_summary(14002, "Changed")))
+        (eo_dir / "EO-14003.json").unlink()
+        (eo_dir / "EO-14004.json").write_text(json.dumps(_summary(14004, "EO 14004")))
+        eos = build()
+
+        assert builds == [3, 0, 2]
+        assert [(eo["eo_number"], eo["title"]) for eo in eos] == [
+            (14004, "EO 14004"), (14002, "Changed"), (14001, "EO 14001"),
+        ]
+
+
+def test_sync_summary_manifest_reparses_records_of_another_normalizer_version():
+    with tempfile.TemporaryDirectory() as tmp:
+        eo_dir = Path(tmp) / "eo"
+        eo_dir.mkdir()
+        for n in (14001, 14002):
+            (eo_dir / f"EO-{n}.json").write_text(json.dumps(_summary(n, f"EO {n}")))
+        db = PropagateDB(Path(tmp) / "test.db")
+
+        with patch(
+            "propagate.build.normalize_summary", wraps=normalize_summary
+        ) as normalize:
+            sync_summary_manifest(db, eo_dir)
+            sync_summary_manifest(db, eo_dir)
+            assert normalize.call_count == 2
+
+            with patch("propagate.build.NORMALIZER_VERSION", 2):
+                sync_summary_manifest(db, eo_dir)
+                sync_summary_manifest(db, eo_dir)
+            assert normalize.call_count == 4
+
+        versions = {e["normalizer_version"] for e in db.get_summary_manifest()}
+        assert versions == {2}
+
+
+def test_write_eo_json_streams_the_json_dump_layout():
+    records = [
+        normalize_summary(_summary(n, f"EO {n}"), 0) for n in (14003, 14002)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "eo.json"
+        assert write_eo_json(iter(records), path, "now") == 2
+        assert path.read_text() == json.dumps({"eos": records, "build_time": "now"})
+
+        assert write_eo_json(iter([]), path, "now") == 0
+        assert json.loads(path.read_text()) == {"eos": [], "build_time": "now"}
+
@@ -0,0 +1,71 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from propagate.chunking import chunk_document, is_oversized, split_pdf
+
+
+def _write_pdf(path: Path, pages: int) -> Path:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_split_pdf_covers_every_page_in_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _write_pdf(Path(tmp) / "EO-1.pdf", 23)
+
+        chunks = split_pdf(pdf_path, max_bytes=10**6, max_pages=5)
+
+        ranges = [(c.start_page, c.end_page) for c in chunks]
+        assert ranges == [(1, 5), (6, 10), (11, 15), (16, 20), (21, 23)]
+        for chunk in chunks:
+            assert chunk.page_count == 23
+            reader = PdfReader(io.BytesIO(chunk.data))
+            assert len(reader.pages) == chunk.end_page - chunk.start_page + 1
+
+
+def test_split_pdf_halves_ranges_over_the_byte_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _write_pdf(Path(tmp) / "EO-1.pdf", 16)
+        one_page = len(split_pdf(pdf_path, max_pages=1)[0].data)
+
+        chunks = split_pdf(pdf_path, max_bytes=one_page * 3, max_pages=16)
+
+        assert all(len(c.data) <= one_page * 3 for c in chunks)
+        pages = [p for c in chunks for p in range(c.start_page, c.end_page + 1)]
+        assert pages == list(range(1, 17))
+
+        with pytest.raises(ValueError):
+            split_pdf(pdf_path, max_bytes=one_page - 1)
+
+
+def test_chunk_document_is_an_inline_pdf():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _write_pdf(Path(tmp) / "EO-1.pdf", 3)
+        document = chunk_document(split_pdf(pdf_path)[0])
+
+    assert document["source"]["type"] == "base64"
+    assert document["title"] == "Pages 1-3 of 3"
+    assert not is_oversized(document)
+
+
+def test_is_oversized_counts_pdf_pages():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _write_pdf(Path(tmp) / "EO-1.pdf", 5)
+        inline = chunk_document(split_pdf(pdf_path)[0])
+        uploaded = {"type": "document", "source": {"type": "file", "file_id": "f"}}
+
+        with patch("propagate.chunking.CHUNK_MAX_PAGES", 4):
+            assert is_oversized(inline)
+            assert is_oversized(uploaded, pdf_path)
+            assert not is_oversized(uploaded)
+        with patch("propagate.chunking.CHUNK_MAX_PAGES", 5):
+            assert not is_oversized(inline)
+            assert not is_oversized(uploaded, pdf_path)
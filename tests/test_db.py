@@ -105,3 +105,79 @@ def test_get_last_processed_for_eo():
         last = db.get_last_processed("donald-trump", 14405)
         assert last is not None
         assert last["run_id"] == r2
+
+
+def test_sync_state_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        assert db.get_sync_state("donald-trump") is None
+        db.set_sync_state("donald-trump", "2026-01-22", ["2026-01234", "2026-01200"])
+        state = db.get_sync_state("donald-trump")
+        assert state["last_publication_date"] == "2026-01-22"
+        assert state["document_numbers"] == ["2026-01200", "2026-01234"]
+
+
+def test_catalog_upsert_replaces_by_document_number():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        db.upsert_catalog("donald-trump", [
+            {"document_number": "2026-01234", "executive_order_number": 14406},
+            {"document_number": "2026-01200", "executive_order_number": 14405},
+        ])
+        db.upsert_catalog("donald-trump", [
+            {"document_number": "2026-01234", "executive_order_number": 14406,
+             "title": "Updated"},
+        ])
+        catalog = db.get_catalog("donald-trump")
+        assert [r["executive_order_number"] for r in catalog] == [14405, 14406]
+        assert catalog[1]["title"] == "Updated"
+        assert db.get_catalog("joe-biden") == []
+
+
+def test_init_adds_columns_to_existing_tables():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE token_usage (id INTEGER PRIMARY KEY, run_id INTEGER,"
+            " eo_number INTEGER, president TEXT, input_tokens INTEGER,"
+            " output_tokens INTEGER, cache_creation_input_tokens INTEGER,"
+            " cache_read_input_tokens INTEGER, recorded_at TEXT)"
+        )
+        conn.close()
+
+        db = PropagateDB(db_path)
+        db.record_usage(1, 14405, "donald-trump", {
+            "output_tokens": 500, "time_to_first_token": 2.0,
+            "tokens_per_second": 50.0,
+        })
+
+        usage = db.get_usage_for_run(1)
+        assert usage["time_to_first_token"] == 2.0
+        assert usage["tokens_per_second"] == 50.0
+
+
+def test_batch_ledger_counts_applied_results():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        run_id = db.start_run(president="donald-trump")
+        db.record_batch(
+            "msgbatch_1", "donald-trump",
+            [("eo-donald-trump-14405-x", 14405), ("eo-donald-trump-14406-x", 14406)],
+            run_id=run_id,
+        )
+        db.record_batch_results("msgbatch_1", [
+            ("eo-donald-trump-14405-x", 14405, "donald-trump", "succeeded"),
+        ])
+
+        batch = db.get_batches()[0]
+        assert batch["run_id"] == run_id
+        assert batch["request_count"] == 2
+        assert (batch["succeeded"], batch["failed"], batch["unapplied"]) == (1, 0, 1)
+
+        db.update_batch("msgbatch_1", None, "ended", ended_at="2026-01-20T01:00:00Z")
+        db.finish_batch("msgbatch_1")
+        batch = db.get_batch("msgbatch_1")
+        assert batch["status"] == "ended"
+        assert batch["president"] == "donald-trump"
+        assert batch["processed_at"] is not None
@@ -0,0 +1,183 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate.db import PropagateDB
+from propagate.federalregister import (
+    download_all_pdfs,
+    iter_downloaded_orders,
+    sync_eo_metadata,
+    verify_pdfs,
+)
+from propagate.httpclient import sha256_file
+from propagate.models import ExecutiveOrder
+from propagate.pdf_store import load_manifest, record_pdf
+
+
+def _order(eo_number: int) -> ExecutiveOrder:
+    return ExecutiveOrder(
+        executive_order_number=eo_number,
+        pdf_url=f"https://www.govinfo.gov/content/pkg/EO-{eo_number}.pdf",
+    )
+
+
+@patch("propagate.federalregister.download_pdf")
+def test_download_all_pdfs_preserves_order(mock_download):
+    def fake_download(order, force=False):
+        # finish in reverse order to exercise result reordering
+        time.sleep((14410 - order.executive_order_number) * 0.005)
+        return Path(f"pdf/EO-{order.executive_order_number}.pdf")
+
+    mock_download.side_effect = fake_download
+    orders = [_order(n) for n in range(14400, 14410)]
+
+    result = download_all_pdfs(orders, workers=4)
+
+    assert [o.executive_order_number for o in result] == list(range(14400, 14410))
+    assert result[0].pdf_path == "pdf/EO-14400.pdf"
+
+
+@patch("propagate.federalregister.download_pdf")
+def test_download_all_pdfs_skips_missing(mock_download):
+    mock_download.side_effect = lambda order, force=False: (
+        None if order.executive_order_number == 14401 else Path("pdf/x.pdf")
+    )
+    orders = [_order(14400), _order(14401), _order(14402)]
+
+    result = download_all_pdfs(orders)
+
+    assert [o.executive_order_number for o in result] == [14400, 14402]
+
+
+@patch("propagate.federalregister.download_pdf")
+def test_iter_downloaded_orders_yields_before_input_is_exhausted(mock_download):
+    mock_download.side_effect = lambda order, force=False: Path("pdf/x.pdf")
+    pages_fetched = []
+
+    def metadata():
+        for page in range(3):
+            pages_fetched.append(page)
+            for n in range(4):
+                yield _order(14400 + page * 4 + n)
+
+    stream = iter_downloaded_orders(metadata(), workers=1)
+    first = next(stream)
+
+    assert first.pdf_path == "pdf/x.pdf"
+    assert pages_fetched == [0]
+    assert len(list(stream)) == 11
+
+
+@patch("propagate.federalregister.download_pdf")
+def test_iter_downloaded_orders_skips_failed_downloads(mock_download):
+    def fake_download(order, force=False):
+        if order.executive_order_number == 14401:
+            raise OSError("Incomplete download")
+        return Path(f"pdf/EO-{order.executive_order_number}.pdf")
+
+    mock_download.side_effect = fake_download
+    orders = [_order(n) for n in range(14400, 14406)]
+
+    downloaded = list(iter_downloaded_orders(iter(orders), workers=2))
+
+    assert sorted(o.executive_order_number for o in downloaded) == [
+        14400, 14402, 14403, 14404, 14405,
+    ]
+
+
+@patch("propagate.federalregister.DOWNLOADS_PER_HOST", 2)
+@patch("propagate.federalregister._host_limits", {})
+@patch("propagate.federalregister.download_pdf")
+def test_download_all_pdfs_limits_per_host(mock_download):
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def fake_download(order, force=False):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return Path("pdf/x.pdf")
+
+    mock_download.side_effect = fake_download
+    orders = [_order(n) for n in range(14400, 14412)]
+
+    download_all_pdfs(orders, workers=8)
+
+    assert peak <= 2
+
+
+@patch("propagate.federalregister.fetch_eo_metadata")
+def test_sync_eo_metadata_uses_watermark(mock_fetch):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        first = ExecutiveOrder(
+            document_number="2026-01200",
+            executive_order_number=14405,
+            publication_date="2026-01-22",
+        )
+        mock_fetch.return_value = [first]
+
+        orders = sync_eo_metadata(db, president="donald-trump")
+
+        assert mock_fetch.call_args.kwargs.get("published_since") is None
+        assert [o.executive_order_number for o in orders] == [14405]
+
+        second = ExecutiveOrder(
+            document_number="2026-01300",
+            executive_order_number=14406,
+            publication_date="2026-01-23",
+        )
+        mock_fetch.return_value = [first, second]
+
+        orders = sync_eo_metadata(db, president="donald-trump")
+
+        assert mock_fetch.call_args.kwargs["published_since"] == "2026-01-22"
+        assert [o.executive_order_number for o in orders] == [14405, 14406]
+        state = db.get_sync_state("donald-trump")
+        assert state["last_publication_date"] == "2026-01-23"
+        assert state["document_numbers"] == ["2026-01300"]
+
+
+def test_verify_pdfs_refetches_only_corrupt_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_dir = Path(tmp)
+        good = b"%PDF-1.7 " + b"g" * 100 + b" %%EOF"
+        (pdf_dir / "EO-14405.pdf").write_bytes(good)
+        (pdf_dir / "EO-14406.pdf").write_bytes(b"%PDF-1.7 trunc")
+
+        with (
+            patch("propagate.pdf_store.PDF_DIR", pdf_dir),
+            patch("propagate.federalregister.download_file") as mock_download,
+        ):
+            record_pdf(
+                pdf_dir / "EO-14405.pdf",
+                sha256_file(pdf_dir / "EO-14405.pdf"),
+                "https://example.com/EO-14405.pdf",
+            )
+            record_pdf(
+                pdf_dir / "EO-14406.pdf", "0" * 64, "https://example.com/EO-14406.pdf"
+            )
+
+            def fake_download(url, dest):
+                dest.write_bytes(good)
+                return sha256_file(dest)
+
+            mock_download.side_effect = fake_download
+
+            corrupt = verify_pdfs(workers=2)
+
+            assert [p.name for p in corrupt] == ["EO-14406.pdf"]
+            mock_download.assert_called_once_with(
+                "https://example.com/EO-14406.pdf", pdf_dir / "EO-14406.pdf"
+            )
+            manifest = load_manifest()
+            assert manifest["EO-14406.pdf"]["sha256"] == sha256_file(
+                pdf_dir / "EO-14406.pdf"
+            )
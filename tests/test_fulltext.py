@@ -0,0 +1,80 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from propagate.fulltext import fetch_full_text, html_to_text, xml_to_text
+from propagate.models import ExecutiveOrder
+from propagate.util import get_document
+
+SAMPLE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<PRESDOCU>
+  <EXECORD>
+    <PRTPAGE P="8451"/>
+    <EXECORDR>Executive Order 14405 of January 20, 2026</EXECORDR>
+    <HD SOURCE="HED">Restoring   Example Policy</HD>
+    <FP>By the authority vested in me as President,</FP>
+    <P><E T="04">Section 1.</E> <E T="03">Purpose.</E> This order
+       establishes an example.</P>
+    <GPH><GID>ED20JA26.000</GID></GPH>
+    <FRDOC>[FR Doc. 2026-01200 Filed 1-21-26; 8:45 am]</FRDOC>
+    <BILCOD>Billing code 3395-F4-P</BILCOD>
+  </EXECORD>
+</PRESDOCU>
+"""
+
+
+def test_xml_to_text_keeps_paragraphs_and_drops_markers():
+    text = xml_to_text(SAMPLE_XML)
+
+    assert "Restoring Example Policy" in text
+    assert "Section 1. Purpose. This order establishes an example." in text
+    assert "ED20JA26" not in text
+    assert "Billing code" not in text
+    assert "8451" not in text
+    assert "\n\n\n" not in text
+
+
+def test_html_to_text_skips_scripts():
+    html = (
+        "<html><head><title>x</title><script>var a;</script></head>"
+        "<body><h1>Executive Order 14405</h1><p>Sec. 1.&nbsp;Purpose.</p></body></html>"
+    )
+
+    text = html_to_text(html)
+
+    assert text == "Executive Order 14405\n\nSec. 1. Purpose."
+
+
+def test_get_document_falls_back_to_pdf_without_text():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "EO-14405.pdf"
+        pdf_path.write_bytes(b"%PDF-1.7")
+        order = ExecutiveOrder(executive_order_number=14405, pdf_path=str(pdf_path))
+
+        with patch("propagate.fulltext.TEXT_DIR", Path(tmp) / "text"):
+            document = get_document(order, source_mode="text")
+
+    assert document["source"]["type"] == "base64"
+
+
+@patch("propagate.fulltext.get_session")
+def test_fetch_full_text_downloads_once(mock_get_session):
+    response = MagicMock()
+    response.content = SAMPLE_XML
+    mock_get_session.return_value.get.return_value = response
+    order = ExecutiveOrder(
+        executive_order_number=14405,
+        full_text_xml_url="https://www.federalregister.gov/documents/full_text/xml/x.xml",
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.fulltext.TEXT_DIR", Path(tmp)):
+            first = fetch_full_text(order)
+            second = fetch_full_text(order)
+            document = get_document(order, source_mode="text")
+
+    assert first == second
+    assert mock_get_session.return_value.get.call_count == 1
+    assert document["source"] == {
+        "type": "text", "media_type": "text/plain", "data": first,
+    }
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import tempfile
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate import httpclient
+
+ETAG = '"v1"'
+PDF_BODY = b"%PDF-1.7 " + b"x" * 200 + b" %%EOF"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen: list[tuple[str, str | None]] = []
+    ranges_seen: list[str | None] = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        self.ranges_seen.append(self.headers.get("Range"))
+        if self.path == "/resumable.pdf":
+            self._send_range()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = (
+            json.dumps({"results": [], "path": self.path}).encode("utf-8")
+            if self.path.startswith("/documents")
+            else b"%PDF-1.7 fake"
+        )
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_range(self):
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == ETAG:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(PDF_BODY):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PDF_BODY)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = PDF_BODY[start:]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(PDF_BODY) - 1}/{len(PDF_BODY)}"
+            )
+        else:
+            body = PDF_BODY
+            self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_get_json_revalidates_with_etag(serve):
+    _Handler.requests_seen = []
+    base = serve(_Handler)
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.httpclient.HTTP_CACHE_DIR", Path(tmp)):
+            first = httpclient.get_json(f"{base}/documents.json", {"page": 1})
+            second = httpclient.get_json(f"{base}/documents.json", {"page": 1})
+
+    assert first == second
+    assert _Handler.requests_seen[0][1] is None
+    assert _Handler.requests_seen[1][1] == ETAG
+
+
+def test_download_file_skips_unchanged(serve):
+    base = serve(_Handler)
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = Path(tmp) / "EO-14405.pdf"
+        with patch("propagate.httpclient.HTTP_CACHE_DIR", Path(tmp) / "cache"):
+            assert httpclient.download_file(f"{base}/EO-14405.pdf", dest)
+            assert httpclient.download_file(f"{base}/EO-14405.pdf", dest) is None
+        assert dest.read_bytes() == b"%PDF-1.7 fake"
+
+
+def test_download_file_resumes_partial_transfer(serve):
+    base = serve(_Handler)
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = Path(tmp) / "EO-14405.pdf"
+        cache_dir = Path(tmp) / "cache"
+        with patch("propagate.httpclient.HTTP_CACHE_DIR", cache_dir):
+            # simulate an interrupted first attempt
+            httpclient._write_atomic(
+                httpclient._validators_path(f"{base}/resumable.pdf"),
+                json.dumps({"etag": ETAG, "last_modified": None}).encode(),
+            )
+            dest.with_name("EO-14405.pdf.part").write_bytes(PDF_BODY[:50])
+
+            digest = httpclient.download_file(f"{base}/resumable.pdf", dest)
+
+        assert dest.read_bytes() == PDF_BODY
+        assert not dest.with_name("EO-14405.pdf.part").exists()
+        assert digest == hashlib.sha256(PDF_BODY).hexdigest()
+
+
+def _resume_from(base: str, tmp: str, part: bytes, validators: dict | None) -> Path:
+    dest = Path(tmp) / "EO-14405.pdf"
+    if validators:
+        httpclient._write_atomic(
+            httpclient._validators_path(f"{base}/resumable.pdf"),
+            json.dumps(validators).encode(),
+        )
+    dest.with_name("EO-14405.pdf.part").write_bytes(part)
+    httpclient.download_file(f"{base}/resumable.pdf", dest)
+    return dest
+
+
+def test_download_file_finishes_or_restarts_after_416(serve):
+    base = serve(_Handler)
+    validators = {"etag": ETAG, "last_modified": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.httpclient.HTTP_CACHE_DIR", Path(tmp) / "cache"):
+            # complete but never renamed
+            dest = _resume_from(base, tmp, PDF_BODY, validators)
+            assert dest.read_bytes() == PDF_BODY
+            dest.unlink()
+
+            # longer than the file on the server
+            dest = _resume_from(base, tmp, PDF_BODY + b"junk", validators)
+            assert dest.read_bytes() == PDF_BODY
+            assert not dest.with_name("EO-14405.pdf.part").exists()
+
+
+def test_download_file_restarts_without_validators(serve):
+    _Handler.ranges_seen = []
+    base = serve(_Handler)
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.httpclient.HTTP_CACHE_DIR", Path(tmp) / "cache"):
+            dest = _resume_from(base, tmp, b"stale bytes", None)
+
+        assert dest.read_bytes() == PDF_BODY
+        assert _Handler.ranges_seen == [None]
+
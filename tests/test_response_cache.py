@@ -0,0 +1,61 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate import response_cache
+from propagate.models import ExecutiveOrder
+from propagate.summarize_eo import summarize_with_claude
+
+
+def _document(data: str) -> dict:
+    return {"type": "document", "source": {"type": "base64", "data": data}}
+
+
+def test_key_depends_on_document_and_model():
+    key = response_cache.response_key(_document("abc"))
+    assert key == response_cache.response_key(_document("abc"))
+    assert key != response_cache.response_key(_document("abd"))
+    with patch("propagate.response_cache.MAX_TOKENS", 1):
+        assert key != response_cache.response_key(_document("abc"))
+
+
+def test_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.response_cache.RESPONSE_CACHE_DIR", Path(tmp)):
+            keys = [response_cache.response_key(_document(str(i))) for i in range(3)]
+            for age, key in enumerate(keys):
+                response_cache.cache_response(key, {"summary": key})
+                path = response_cache._entry_path(key)
+                os.utime(path, (1000 + age, 1000 + age))
+
+            # reading the oldest entry makes it the most recently used
+            assert response_cache.get_cached_response(keys[0]) == {"summary": keys[0]}
+
+            assert response_cache.evict_responses(max_entries=2) == 1
+            assert response_cache.get_cached_response(keys[1]) is None
+            assert response_cache.get_cached_response(keys[0]) is not None
+            assert response_cache.get_cached_response(keys[2]) is not None
+
+
+@patch("propagate.summarize_eo.create_claude_message")
+@patch("propagate.summarize_eo.get_document")
+def test_summarize_with_claude_skips_api_on_cache_hit(mock_document, mock_create):
+    mock_document.return_value = _document("abc")
+    with tempfile.TemporaryDirectory() as tmp:
+        order = ExecutiveOrder(executive_order_number=14405)
+        with (
+            patch("propagate.response_cache.RESPONSE_CACHE_DIR", Path(tmp)),
+            patch.object(
+                ExecutiveOrder,
+                "get_claude_json_path",
+                return_value=Path(tmp) / "EO-14405-claude.json",
+            ),
+        ):
+            key = response_cache.response_key(_document("abc"))
+            response_cache.cache_response(key, {"summary": "cached"})
+
+            result = summarize_with_claude(order)
+
+        assert result == {"summary": "cached"}
+        mock_create.assert_not_called()
@@ -1,8 +1,10 @@
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from propagate.run import PipelineRunner
+from propagate.summarize_eo import BatchJob, BatchSubmitError
 
 
 def _make_runner(tmp_dir: str) -> PipelineRunner:
@@ -20,6 +22,17 @@ def _mock_order(eo_number: int, has_summary: bool = False):
     return order
 
 
+def _batch_status(status: str, processing: int = 0, succeeded: int = 2):
+    return SimpleNamespace(
+        processing_status=status,
+        ended_at=None,
+        request_counts=SimpleNamespace(
+            processing=processing, succeeded=succeeded,
+            errored=0, canceled=0, expired=0,
+        ),
+    )
+
+
 @patch("propagate.run.fetch_all_executive_orders")
 def test_no_new_orders_skips_batch(mock_fetch):
     with tempfile.TemporaryDirectory() as tmp:
@@ -36,7 +49,7 @@ def test_no_new_orders_skips_batch(mock_fetch):
         assert run["batch_id"] is None
 
 
-@patch("propagate.run.time.sleep")
+@patch("propagate.batch_watcher.time.sleep")
 @patch("propagate.run.subprocess")
 @patch("propagate.run.build_from_summaries")
 @patch("propagate.run.download_and_process_batch")
@@ -51,27 +64,75 @@ def test_new_orders_full_pipeline(
         for o in orders:
             o.summary_exists.side_effect = [False, True]
         mock_fetch.return_value = orders
+        mock_process.return_value = []
 
         mock_batch_response = MagicMock()
         mock_batch_response.id = "msgbatch_test123"
-        mock_batch.return_value = (mock_batch_response, ["req1", "req2"])
+        mock_batch.return_value = BatchJob(
+            batches=[mock_batch_response],
+            request_ids={
+                "msgbatch_test123": [
+                    "eo-donald-trump-14405-abcd1234", "eo-donald-trump-14406-abcd1234",
+                ]
+            },
+        )
 
         mock_client = MagicMock()
-        mock_status = MagicMock()
-        mock_status.processing_status = "ended"
-        mock_client.messages.batches.retrieve.return_value = mock_status
+        mock_client.messages.batches.retrieve.return_value = _batch_status("ended")
 
-        with patch("propagate.run.get_client", return_value=mock_client):
+        with patch("propagate.batch_watcher.get_client", return_value=mock_client):
             runner.run()
 
         run = runner.db.get_recent_runs(1)[0]
         assert run["status"] == "success"
         assert run["batch_id"] == "msgbatch_test123"
+        assert run["poll_count"] == 1
         assert run["eos_new"] == 2
         mock_process.assert_called_once()
         mock_build.assert_called_once()
 
 
+@patch("propagate.batch_watcher.time.sleep")
+@patch("propagate.run.subprocess")
+@patch("propagate.run.build_from_summaries")
+@patch("propagate.run.download_and_process_batch")
+@patch("propagate.run.batch_summarize_with_claude")
+@patch("propagate.run.fetch_all_executive_orders")
+def test_multi_batch_job_processes_every_batch(
+    mock_fetch, mock_batch, mock_process, mock_build, mock_subprocess, mock_sleep
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _make_runner(tmp)
+        orders = [_mock_order(14405), _mock_order(14406)]
+        for o in orders:
+            o.summary_exists.side_effect = [False, True]
+        mock_fetch.return_value = orders
+        mock_process.return_value = []
+
+        first, second = MagicMock(), MagicMock()
+        first.id, second.id = "msgbatch_a", "msgbatch_b"
+        mock_batch.return_value = BatchJob(
+            batches=[first, second],
+            request_ids={
+                "msgbatch_a": ["eo-donald-trump-14405-abcd1234"],
+                "msgbatch_b": ["eo-donald-trump-14406-abcd1234"],
+            },
+        )
+
+        mock_client = MagicMock()
+        mock_client.messages.batches.retrieve.return_value = _batch_status("ended")
+
+        with patch("propagate.batch_watcher.get_client", return_value=mock_client):
+            runner.run()
+
+        run = runner.db.get_recent_runs(1)[0]
+        assert run["status"] == "success"
+        assert run["batch_id"] == "msgbatch_a,msgbatch_b"
+        assert [c.args[0] for c in mock_process.call_args_list] == [
+            "msgbatch_a", "msgbatch_b",
+        ]
+
+
 @patch("propagate.run.fetch_all_executive_orders")
 def test_fetch_failure_records_error(mock_fetch):
     with tempfile.TemporaryDirectory() as tmp:
@@ -83,3 +144,152 @@ def test_fetch_failure_records_error(mock_fetch):
         run = runner.db.get_recent_runs(1)[0]
         assert run["status"] == "failed"
         assert "API down" in run["error"]
+
+
+@patch("propagate.batch_watcher.time.sleep")
+@patch("propagate.run.subprocess")
+@patch("propagate.run.build_from_summaries")
+@patch("propagate.run.download_and_process_batch")
+@patch("propagate.run.batch_summarize_with_claude")
+@patch("propagate.run.fetch_all_executive_orders")
+def test_failed_requests_are_resubmitted_in_the_same_run(
+    mock_fetch, mock_batch, mock_process, mock_build, mock_subprocess, mock_sleep
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _make_runner(tmp)
+        orders = [_mock_order(14405), _mock_order(14406)]
+        for o in orders:
+            o.summary_exists.side_effect = [False, True]
+        mock_fetch.return_value = orders
+
+        first, retry = MagicMock(), MagicMock()
+        first.id, retry.id = "msgbatch_a", "msgbatch_b"
+        mock_batch.side_effect = [
+            BatchJob(
+                batches=[first],
+                request_ids={
+                    "msgbatch_a": [
+                        "eo-donald-trump-14405-aaaa", "eo-donald-trump-14406-aaaa",
+                    ]
+                },
+            ),
+            BatchJob(
+                batches=[retry],
+                request_ids={"msgbatch_b": ["eo-donald-trump-14406-bbbb"]},
+            ),
+        ]
+        mock_process.side_effect = [["eo-donald-trump-14406-aaaa"], []]
+
+        mock_client = MagicMock()
+        mock_client.messages.batches.retrieve.return_value = _batch_status("ended")
+
+        with patch("propagate.batch_watcher.get_client", return_value=mock_client):
+            runner.run()
+
+        run = runner.db.get_recent_runs(1)[0]
+        assert run["status"] == "success"
+        assert run["batch_id"] == "msgbatch_a,msgbatch_b"
+        assert mock_batch.call_args_list[1].args[0] == [orders[1]]
+
+
+@patch("propagate.batch_watcher.time.sleep")
+@patch("propagate.run.subprocess")
+@patch("propagate.run.build_from_summaries")
+@patch("propagate.run.download_and_process_batch")
+@patch("propagate.run.batch_summarize_with_claude")
+@patch("propagate.run.fetch_all_executive_orders")
+def test_resubmission_stops_after_max_attempts(
+    mock_fetch, mock_batch, mock_process, mock_build, mock_subprocess, mock_sleep
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _make_runner(tmp)
+        order = _mock_order(14405)
+        mock_fetch.return_value = [order]
+
+        def fake_batch(orders, president_key, **kwargs):
+            batch = MagicMock()
+            batch.id = f"msgbatch_{mock_batch.call_count}"
+            return BatchJob(
+                batches=[batch], request_ids={batch.id: ["eo-donald-trump-14405-x"]}
+            )
+
+        mock_batch.side_effect = fake_batch
+        mock_process.return_value = ["eo-donald-trump-14405-x"]
+
+        mock_client = MagicMock()
+        mock_client.messages.batches.retrieve.return_value = _batch_status("ended")
+
+        with (
+            patch("propagate.batch_watcher.get_client", return_value=mock_client),
+            patch("propagate.run.BATCH_MAX_ATTEMPTS", 2),
+        ):
+            runner.run()
+
+        run = runner.db.get_recent_runs(1)[0]
+        assert mock_batch.call_count == 2
+        assert run["status"] == "failed"
+
+
+@patch("propagate.run.content_hash", return_value="abc123")
+@patch("propagate.batch_watcher.time.sleep")
+@patch("propagate.run.subprocess")
+@patch("propagate.run.build_from_summaries")
+@patch("propagate.run.download_and_process_batch")
+@patch("propagate.run.batch_summarize_with_claude")
+@patch("propagate.run.fetch_all_executive_orders")
+def test_unchanged_site_skips_web_build_and_deploy(
+    mock_fetch, mock_batch, mock_process, mock_build, mock_subprocess, mock_sleep,
+    mock_hash,
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _make_runner(tmp)
+        mock_process.return_value = []
+        mock_batch_response = MagicMock()
+        mock_batch_response.id = "msgbatch_test123"
+        mock_batch.return_value = BatchJob(
+            batches=[mock_batch_response],
+            request_ids={"msgbatch_test123": ["eo-donald-trump-14405-abcd1234"]},
+        )
+        mock_client = MagicMock()
+        mock_client.messages.batches.retrieve.return_value = _batch_status("ended")
+
+        for _ in range(2):
+            order = _mock_order(14405)
+            order.summary_exists.side_effect = [False, True]
+            mock_fetch.return_value = [order]
+            with patch("propagate.batch_watcher.get_client", return_value=mock_client):
+                runner.run()
+
+        second, first = runner.db.get_recent_runs(2)
+        assert first["deployed"] == 1
+        assert first["content_hash"] == "abc123"
+        assert first["deploy_seconds"] is not None
+        assert second["status"] == "success"
+        assert second["deployed"] == 0
+        assert second["skip_reason"] == "unchanged"
+        assert second["build_seconds"] is not None
+        assert second["deploy_seconds"] is None
+        # cp, cp, npm run build and netlify deploy, for the first run only
+        assert mock_subprocess.run.call_count == 4
+
+
+@patch("propagate.run.batch_summarize_with_claude")
+@patch("propagate.run.fetch_all_executive_orders")
+def test_batches_created_before_a_submit_failure_are_recorded(mock_fetch, mock_batch):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = _make_runner(tmp)
+        mock_fetch.return_value = [_mock_order(14405)]
+        mock_batch_response = MagicMock()
+        mock_batch_response.id = "msgbatch_test123"
+        mock_batch.side_effect = BatchSubmitError(
+            BatchJob(
+                batches=[mock_batch_response],
+                request_ids={"msgbatch_test123": ["eo-donald-trump-14405-abcd1234"]},
+            )
+        )
+
+        runner.run()
+
+        assert runner.db.get_recent_runs(1)[0]["status"] == "failed"
+        assert runner.db.get_batch("msgbatch_test123") is not None
+        assert len(runner.db.get_batch_requests("msgbatch_test123")) == 1
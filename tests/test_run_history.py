@@ -17,7 +17,9 @@ def test_format_status_with_runs():
         db = PropagateDB(Path(tmp) / "test.db")
         r1 = db.start_run(president="donald-trump")
         db.finish_run(r1, status="success", eos_found=45, eos_new=3,
-                      batch_id="msgbatch_abc", poll_seconds=340, deployed=True)
+                      batch_id="msgbatch_abc", poll_seconds=340, deployed=True,
+                      poll_count=9, detect_seconds=12.4, build_seconds=41.2,
+                      deploy_seconds=63.0)
         db.insert_eo(r1, eo_number=14405, president="donald-trump", status="success")
         db.insert_eo(r1, eo_number=14406, president="donald-trump", status="success")
         db.insert_eo(r1, eo_number=14407, president="donald-trump", status="success")
@@ -27,6 +29,8 @@ def test_format_status_with_runs():
         assert "45" in output
         assert "3" in output
         assert "msgbatch_abc" in output
+        assert "9 polls, detected 12s after ending" in output
+        assert "Build:        41s, deploy 63s" in output
 
 
 def test_format_status_with_failure():
@@ -38,3 +42,25 @@ def test_format_status_with_failure():
         output = format_status(db)
         assert "failed" in output
         assert "API timeout" in output
+
+
+def test_format_status_with_token_usage():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PropagateDB(Path(tmp) / "test.db")
+        r1 = db.start_run(president="donald-trump")
+        db.record_usage(r1, 14405, "donald-trump", {
+            "input_tokens": 120, "output_tokens": 900,
+            "cache_creation_input_tokens": 4000, "cache_read_input_tokens": 0,
+        })
+        db.record_usage(r1, 14406, "donald-trump", {
+            "input_tokens": 110, "output_tokens": 800,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 4000,
+            "time_to_first_token": 1.5, "tokens_per_second": 80.0,
+        })
+        db.finish_run(r1, status="success", eos_found=2, eos_new=2)
+
+        output = format_status(db)
+        assert "230 input" in output
+        assert "4000 cache read" in output
+        assert "4000 cache write" in output
+        assert "1.5s to first token, 80 tokens/s" in output
@@ -0,0 +1,31 @@
+from propagate.search_index import build_search_index, tokenize
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("Protecting the U.S. Power-Grid of 2025") == [
+        "protecting", "power", "grid", "2025",
+    ]
+
+
+def test_build_search_index_weights_fields():
+    records = [
+        {"eo_number": 14002, "title": "Energy", "summary": "Energy and energy"},
+        {
+            "eo_number": 14001,
+            "title": "Tariffs",
+            "deeper_dive": "energy",
+            "key_industries": ["Steel", "Energy"],
+            "categories": {"policy_domain": "Trade"},
+        },
+    ]
+    index = build_search_index(records)
+
+    assert list(index) == ["terms"]
+    assert list(index["terms"]) == sorted(index["terms"])
+    # postings point at record positions and a repeated term counts once per
+    # field: title 8 + summary 4 for the first, key_industries 3 for the
+    # second, whose deeper_dive is not indexed
+    assert index["terms"]["energy"] == [0, 12, 1, 3]
+    assert index["terms"]["trade"] == [1, 3]
+    assert "and" not in index["terms"]
+
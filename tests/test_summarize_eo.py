@@ -0,0 +1,430 @@
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import anthropic
+import pytest
+import requests
+from anthropic.types.messages.message_batch import MessageBatch
+from propagate.chunking import PdfChunk
+from propagate.models import ExecutiveOrder
+from propagate.prompts import MERGE_PROMPT
+from propagate.ratelimit import AdaptiveRateLimiter
+from propagate.summarize_eo import (
+    BatchSubmitError,
+    _submit_spool,
+    batch_summarize_with_claude,
+    build_message_params,
+    create_claude_message,
+    summarize_in_chunks,
+    summarize_orders,
+)
+
+
+def _rate_limit_error() -> anthropic.RateLimitError:
+    response = MagicMock(status_code=429, headers={"retry-after": "0"})
+    return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+
+@patch("propagate.summarize_eo.save_claude_json")
+@patch("propagate.summarize_eo.cache_response")
+@patch("propagate.summarize_eo.get_cached_response", return_value=None)
+@patch(
+    "propagate.summarize_eo.get_document", return_value={"source": {"type": "text"}}
+)
+@patch("propagate.summarize_eo.create_claude_message")
+def test_summarize_orders_retries_rate_limits_and_isolates_failures(
+    mock_create, mock_document, mock_cached, mock_cache, mock_save, tmp_path
+):
+    attempts = {}
+
+    def fake_create(order, limiter=None, document=None, prompt=None, on_usage=None):
+        n = order.executive_order_number
+        attempts[n] = attempts.get(n, 0) + 1
+        assert limiter._active >= 1
+        if n == 14405 and attempts[n] == 1:
+            raise _rate_limit_error()
+        message = MagicMock()
+        text = "bad json" if n == 14406 else json.dumps({"summary": "x"})
+        message.content[0].text = text
+        return message
+
+    mock_create.side_effect = fake_create
+    orders = [ExecutiveOrder(executive_order_number=n) for n in (14405, 14406, 14407)]
+
+    with (
+        patch("propagate.summarize_eo.claude_json_to_summary"),
+        patch("propagate.summarize_eo.save_summary", return_value=tmp_path),
+        patch.object(ExecutiveOrder, "get_summary_path", return_value=tmp_path / "x"),
+    ):
+        results = summarize_orders(orders, workers=2)
+
+    by_number = {r.order.executive_order_number: r for r in results}
+    assert by_number[14405].status == "success"
+    assert attempts[14405] == 2
+    assert by_number[14406].status == "failed"
+    assert "Expecting value" in by_number[14406].error
+    assert by_number[14407].status == "success"
+
+
+def test_rate_limiter_halves_and_recovers_concurrency():
+    limiter = AdaptiveRateLimiter(8)
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.limit == 4
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.limit == 2
+    limiter.on_success()
+    assert limiter.limit == 3
+
+
+def _message_batch(batch_id: str) -> dict:
+    return {
+        "id": batch_id,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "created_at": "2026-01-20T00:00:00Z",
+        "ended_at": None,
+        "expires_at": "2026-01-21T00:00:00Z",
+        "processing_status": "in_progress",
+        "request_counts": {
+            "canceled": 0,
+            "errored": 0,
+            "expired": 0,
+            "processing": 1,
+            "succeeded": 0,
+        },
+        "results_url": None,
+        "type": "message_batch",
+    }
+
+
+@patch("propagate.summarize_eo.get_cached_response", return_value=None)
+@patch(
+    "propagate.summarize_eo.get_document", return_value={"source": {"type": "base64"}}
+)
+@patch("propagate.summarize_eo._submit_spool")
+@patch("propagate.summarize_eo.create_claude_batch_request")
+def test_batch_summarize_spools_and_splits_by_size(
+    mock_create, mock_submit, mock_document, mock_cached
+):
+    mock_create.side_effect = lambda order, uid, document: ({"custom_id": uid}, 40)
+    created = []
+    lock = threading.Lock()
+
+    def fake_submit(spool_path, count, extra_headers):
+        with lock:
+            batch_id = f"msgbatch_{len(created)}"
+            created.append(
+                [json.loads(line)["custom_id"] for line in spool_path.open()]
+            )
+        spool_path.unlink()
+        return MessageBatch.model_validate(_message_batch(batch_id))
+
+    mock_submit.side_effect = fake_submit
+    orders = [ExecutiveOrder(executive_order_number=n) for n in range(14400, 14405)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.summarize_eo.BATCH_SPOOL_DIR", Path(tmp)):
+            job = batch_summarize_with_claude(orders, "donald-trump", max_bytes=120)
+            assert list(Path(tmp).iterdir()) == []
+
+    assert sorted(len(ids) for ids in created) == [1, 2, 2]
+    assert len(job.batches) == 3
+    assert len(job.all_request_ids) == 5
+    for ids in job.request_ids.values():
+        assert ids in created
+
+
+@patch("propagate.summarize_eo.get_cached_response", return_value=None)
+@patch(
+    "propagate.summarize_eo.get_document", return_value={"source": {"type": "base64"}}
+)
+@patch("propagate.summarize_eo.get_session")
+@patch("propagate.summarize_eo.get_client")
+@patch("propagate.summarize_eo.create_claude_batch_request")
+def test_batch_summarize_reports_batches_created_before_a_failure(
+    mock_create, mock_get_client, mock_get_session, mock_document, mock_cached
+):
+    mock_create.side_effect = lambda order, uid, document: ({"custom_id": uid}, 40)
+    mock_get_client.return_value.base_url = "http://batches.invalid"
+    mock_get_client.return_value.default_headers = {}
+    created = MagicMock()
+    created.json.return_value = _message_batch("msgbatch_0")
+    mock_get_session.return_value.post.side_effect = [
+        created,
+        requests.ConnectionError("connection reset"),
+    ]
+
+    def orders():
+        for n in range(14400, 14406):
+            yield ExecutiveOrder(executive_order_number=n)
+        raise RuntimeError("metadata stream failed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("propagate.summarize_eo.BATCH_SPOOL_DIR", Path(tmp)):
+            with pytest.raises(BatchSubmitError) as excinfo:
+                batch_summarize_with_claude(orders(), "donald-trump", max_bytes=120)
+            # spools of failed and unsubmitted batches are not left behind
+            assert list(Path(tmp).iterdir()) == []
+
+    job = excinfo.value.job
+    assert job.batch_ids == ["msgbatch_0"]
+    assert len(job.all_request_ids) == 2
+    assert isinstance(excinfo.value.__cause__, RuntimeError)
+
+
+class _BatchesHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Message Batches endpoint."""
+
+    received: list[dict] = []
+
+    def do_POST(self):
+        # a streamed body has no length up front
+        assert "Content-Length" not in self.headers
+        assert self.headers["Transfer-Encoding"] == "chunked"
+        body = b""
+        while size := int(self.rfile.readline().strip(), 16):
+            body += self.rfile.read(size)
+            self.rfile.readline()
+        self.rfile.readline()
+        self.received.append({"headers": dict(self.headers), "body": json.loads(body)})
+
+        payload = json.dumps(_message_batch("msgbatch_1")).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_submit_spool_streams_the_spool_with_client_headers(serve):
+    base_url = serve(_BatchesHandler)
+    _BatchesHandler.received = []
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        patch("propagate.util.client", None),
+        patch("propagate.util.CLAUDE_API_KEY", "test-key"),
+        patch("propagate.util.ANTHROPIC_BASE_URL", base_url),
+        patch("propagate.summarize_eo.json", wraps=json) as mock_json,
+    ):
+        spool_path = Path(tmp) / "spool.jsonl"
+        spool_path.write_text('{"custom_id": "a"}\n{"custom_id": "b"}\n')
+        batch = _submit_spool(spool_path, 2, {"anthropic-beta": "files"})
+        assert not spool_path.exists()
+
+    # the spool is never read back into request objects
+    mock_json.loads.assert_not_called()
+    assert batch.id == "msgbatch_1"
+    (received,) = _BatchesHandler.received
+    assert received["body"] == {"requests": [{"custom_id": "a"}, {"custom_id": "b"}]}
+    headers = {k.lower(): v for k, v in received["headers"].items()}
+    assert headers["x-api-key"] == "test-key"
+    assert headers["anthropic-version"]
+    assert headers["anthropic-beta"] == "files"
+
+
+@patch("propagate.summarize_eo.save_claude_summary")
+@patch("propagate.summarize_eo.cache_response")
+@patch("propagate.summarize_eo.get_cached_response", return_value=None)
+@patch("propagate.summarize_eo.is_oversized", return_value=True)
+@patch(
+    "propagate.summarize_eo.get_document", return_value={"source": {"type": "base64"}}
+)
+@patch("propagate.summarize_eo.summarize_in_chunks")
+def test_batch_summarize_chunks_oversized_orders_through_the_limiter(
+    mock_chunks, mock_document, mock_oversized, mock_cached, mock_cache, mock_save
+):
+    calls = []
+
+    def fake_chunks(order, limiter, on_usage):
+        calls.append(limiter)
+        on_usage(order, {"input_tokens": 1})
+        return {"summary": "chunked"}
+
+    mock_chunks.side_effect = fake_chunks
+    usage = []
+    order = ExecutiveOrder(executive_order_number=14400, pdf_path="EO-14400.pdf")
+
+    job = batch_summarize_with_claude(
+        [order], "donald-trump", on_usage=lambda o, u: usage.append(u)
+    )
+
+    assert job is None
+    (limiter,) = calls
+    assert isinstance(limiter, AdaptiveRateLimiter)
+    assert usage == [{"input_tokens": 1}]
+    mock_oversized.assert_called_once_with(mock_document.return_value, "EO-14400.pdf")
+    mock_save.assert_called_once_with(order, {"summary": "chunked"})
+
+
+def test_batch_summarize_returns_none_when_empty():
+    assert batch_summarize_with_claude([], "donald-trump") is None
+
+
+def test_build_message_params_marks_static_prefix_cacheable():
+    document = {"type": "document", "source": {"type": "base64", "data": "x"}}
+
+    plain = build_message_params(document, prompt_caching=False)
+    cached = build_message_params(document, prompt_caching=True)
+
+    assert isinstance(plain["system"], str)
+    assert "cache_control" not in plain["messages"][0]["content"][0]
+    assert cached["system"][0]["cache_control"] == {"type": "ephemeral"}
+    prompt, doc = cached["messages"][0]["content"]
+    assert prompt["cache_control"] == {"type": "ephemeral"}
+    assert doc is document
+
+
+@patch("propagate.summarize_eo.create_claude_message")
+@patch("propagate.summarize_eo.split_pdf")
+def test_summarize_in_chunks_merges_partial_summaries(mock_split, mock_create):
+    mock_split.return_value = [
+        PdfChunk(1, 100, 250, b"%PDF-a"),
+        PdfChunk(101, 200, 250, b"%PDF-b"),
+        PdfChunk(201, 250, 250, b"%PDF-c"),
+    ]
+    prompts = []
+
+    def fake_create(order, limiter=None, document=None, prompt=None, on_usage=None):
+        prompts.append(prompt)
+        on_usage(order, {"input_tokens": 1})
+        message = MagicMock()
+        if prompt == MERGE_PROMPT:
+            text = document["source"]["data"]
+            assert text.index("Pages 1-100") < text.index("Pages 201-250")
+            message.content[0].text = json.dumps({"summary": "whole order"})
+        else:
+            message.content[0].text = json.dumps({"summary": document["title"]})
+        return message
+
+    mock_create.side_effect = fake_create
+    usage = []
+    order = ExecutiveOrder(executive_order_number=14400, pdf_path="EO-14400.pdf")
+
+    result = summarize_in_chunks(order, on_usage=lambda o, u: usage.append(u))
+
+    assert result == {"summary": "whole order"}
+    assert prompts.count(MERGE_PROMPT) == 1
+    assert prompts[-1] == MERGE_PROMPT
+    assert len(usage) == 4
+
+
+
+@patch("propagate.summarize_eo.create_claude_message")
+@patch("propagate.summarize_eo.split_pdf")
+def test_summarize_in_chunks_takes_a_slot_and_retries_per_request(
+    mock_split, mock_create
+):
+    mock_split.return_value = [
+        PdfChunk(start, start + 9, 40, b"%PDF") for start in (1, 11, 21, 31)
+    ]
+    limiter = AdaptiveRateLimiter(2)
+    lock = threading.Lock()
+    requested = []
+    active = peak = 0
+
+    def fake_create(order, limiter=None, document=None, prompt=None, on_usage=None):
+        nonlocal active, peak
+        with lock:
+            requested.append(document.get("title", "merge"))
+            active += 1
+            peak = max(peak, active)
+        try:
+            time.sleep(0.01)
+            if requested.count("Pages 11-20 of 40") == 1 and (
+                document.get("title") == "Pages 11-20 of 40"
+            ):
+                raise _rate_limit_error()
+            message = MagicMock()
+            message.content[0].text = json.dumps({"summary": "x"})
+            return message
+        finally:
+            with lock:
+                active -= 1
+
+    mock_create.side_effect = fake_create
+    order = ExecutiveOrder(executive_order_number=14400, pdf_path="EO-14400.pdf")
+
+    assert summarize_in_chunks(order, limiter) == {"summary": "x"}
+
+    # only the rate limited chunk is requested again
+    assert sorted(requested) == sorted([
+        "Pages 1-10 of 40", "Pages 11-20 of 40", "Pages 11-20 of 40",
+        "Pages 21-30 of 40", "Pages 31-40 of 40", "merge",
+    ])
+    assert peak <= 2
+    assert limiter._active == 0
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    """Minimal local stand-in for a streamed Messages API response."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        text = json.dumps({"summary": "streamed"})
+        events = [
+            ("message_start", {"type": "message_start", "message": {
+                "id": "msg_1", "type": "message", "role": "assistant",
+                "model": "claude", "content": [], "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": 10, "output_tokens": 1},
+            }}),
+            ("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            }),
+            *[
+                ("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": part},
+                })
+                for part in (text[:10], text[10:])
+            ],
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 40},
+            }),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for name, data in events:
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_streamed_message_reports_latency_with_usage(serve):
+    base_url = serve(_StreamingHandler)
+    document = {"type": "document", "source": {"type": "text", "data": "EO"}}
+    usage = []
+
+    with (
+        patch("propagate.util.client", None),
+        patch("propagate.util.CLAUDE_API_KEY", "test-key"),
+        patch("propagate.util.ANTHROPIC_BASE_URL", base_url),
+        patch("propagate.summarize_eo.MODEL", "claude"),
+    ):
+        message = create_claude_message(
+            ExecutiveOrder(executive_order_number=14405),
+            document=document,
+            on_usage=lambda order, u: usage.append(u),
+            stream=True,
+        )
+
+    assert json.loads(message.content[0].text) == {"summary": "streamed"}
+    assert usage[0]["output_tokens"] == 40
+    assert usage[0]["time_to_first_token"] >= 0
+    assert "tokens_per_second" in usage[0]
@@ -0,0 +1,71 @@
+import json
+import tempfile
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest.mock import patch
+
+from propagate import util
+from propagate.db import PropagateDB
+from propagate.models import ExecutiveOrder
+from propagate.uploads import FILES_API_BETA
+
+
+class _FilesHandler(BaseHTTPRequestHandler):
+    """Minimal local stand-in for the Files API upload endpoint."""
+
+    uploads: list[dict] = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.uploads.append({
+            "path": self.path,
+            "beta": self.headers.get("anthropic-beta"),
+            "body": body,
+        })
+        payload = json.dumps({
+            "id": f"file_{len(self.uploads)}",
+            "type": "file",
+            "filename": "EO-14405.pdf",
+            "mime_type": "application/pdf",
+            "size_bytes": 12,
+            "created_at": "2026-01-20T00:00:00Z",
+            "downloadable": False,
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_file_mode_uploads_each_pdf_once(serve):
+    _FilesHandler.uploads = []
+    base_url = serve(_FilesHandler)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "EO-14405.pdf"
+        pdf_path.write_bytes(b"%PDF-1.7 eo")
+        order = ExecutiveOrder(executive_order_number=14405, pdf_path=str(pdf_path))
+        db = PropagateDB(Path(tmp) / "test.db")
+
+        with (
+            patch("propagate.util.client", None),
+            patch("propagate.util.CLAUDE_API_KEY", "test-key"),
+            patch("propagate.util.ANTHROPIC_BASE_URL", base_url),
+            patch("propagate.uploads._db", db),
+        ):
+            first = util.get_document(order, source_mode="file")
+            second = util.get_document(order, source_mode="file")
+
+    assert first == {
+        "type": "document",
+        "source": {"type": "file", "file_id": "file_1"},
+    }
+    assert second == first
+    assert len(_FilesHandler.uploads) == 1
+    assert _FilesHandler.uploads[0]["path"].startswith("/v1/files")
+    assert FILES_API_BETA in _FilesHandler.uploads[0]["beta"]
+    assert b"%PDF-1.7 eo" in _FilesHandler.uploads[0]["body"]
@@ -0,0 +1,100 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from propagate.webdata import INDEX_FIELDS, content_hash, write_web_data
+
+
+def _record(eo_number: int, president: str, signing_date: str) -> dict:
+    return {
+        "eo_number": eo_number,
+        "title": f"EO {eo_number}",
+        "signing_date": signing_date,
+        "president": president,
+        "summary": "x",
+        "deeper_dive": "long text " * 100,
+        "categories": {"policy_domain": "y"},
+    }
+
+
+def test_write_web_data_shards_details_and_skips_unchanged():
+    records = [
+        _record(14003, "Joseph R. Biden Jr.", "2021-01-22"),
+        _record(14002, "Joseph R. Biden Jr.", "2021-01-21"),
+        _record(13999, "Donald Trump", "2020-12-30"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        write_web_data(records, out_dir, "t1")
+
+        index = json.loads((out_dir / "index.json").read_text())
+        assert index["build_time"] == "t1"
+        assert [eo["shard"] for eo in index["eos"]] == [
+            "joe-biden-2021", "joe-biden-2021", "donald-trump-2020",
+        ]
+        assert set(index["eos"][0]) == set(INDEX_FIELDS) | {"shard"}
+        search = json.loads((out_dir / "search.json").read_text())
+        assert search["terms"]["eo"] == [0, 8, 1, 8, 2, 8]
+        assert "long" not in search["terms"]
+
+        shard = out_dir / "details" / "joe-biden-2021.json"
+        assert json.loads(shard.read_text())["eos"] == records[:2]
+        assert gzip.decompress((out_dir / "index.json.gz").read_bytes()) == (
+            (out_dir / "index.json").read_bytes()
+        )
+
+        # only the changed shard is rewritten and the emptied one is removed
+        trump = out_dir / "details" / "donald-trump-2020.json"
+        biden_mtime = shard.stat().st_mtime_ns
+        records = [records[0], records[1] | {"title": "Changed"}]
+        records.append(_record(12000, "Barack Obama", "2016-03-01"))
+        write_web_data(records, out_dir, "t2")
+
+        assert not trump.exists()
+        assert not trump.with_name(trump.name + ".gz").exists()
+        assert shard.stat().st_mtime_ns != biden_mtime
+        obama = out_dir / "details" / "barack-obama-2016.json"
+        obama_mtime = obama.stat().st_mtime_ns
+        write_web_data(records, out_dir, "t3")
+        assert obama.stat().st_mtime_ns == obama_mtime
+
+
+def test_write_web_data_merges_non_consecutive_shard_records():
+    records = [
+        _record(14002, "Joseph R. Biden Jr.", "2021-01-21"),
+        _record(14001, "Donald Trump", "2021-01-19"),
+        _record(14000, "Joseph R. Biden Jr.", "2021-01-20"),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_web_data(iter(records), Path(tmp), "t1")
+
+        shard = Path(tmp) / "details" / "joe-biden-2021.json"
+        eos = json.loads(shard.read_text())["eos"]
+        assert [eo["eo_number"] for eo in eos] == [14002, 14000]
+
+
+def test_content_hash_ignores_build_time_and_compressed_copies():
+    records = [_record(14002, "Joseph R. Biden Jr.", "2021-01-21")]
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        write_web_data(records, out_dir, "t1")
+        first = content_hash([], data=[out_dir])
+
+        (out_dir / "index.json.gz").write_bytes(b"stale")
+        write_web_data(records, out_dir, "t2")
+        assert content_hash([], data=[out_dir]) == first
+
+        write_web_data([records[0] | {"title": "Changed"}], out_dir, "t3")
+        assert content_hash([], data=[out_dir]) != first
+
+
+def test_content_hash_keeps_source_files_whole():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "package.json"
+        source.write_text('{"name": "web", "build_time": "t1"}')
+        first = content_hash([source])
+
+        source.write_text('{"name": "web", "build_time": "t2"}')
+        assert content_hash([source]) != first
+
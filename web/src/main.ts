@@ -1,9 +1,9 @@
 import "./style.css";
-import Fuse from 'fuse.js';
 
 let eos: Eo[] = []
 let buildTime: string = ''
-let fuse: Fuse<Eo> | null = null
+let searchIndex: Promise<SearchIndex> | null = null
+const shards = new Map<string, Promise<Map<number, Eo>>>()
 
 type Eo = {
   deeper_dive: string;
@@ -19,8 +19,20 @@ type Eo = {
   title: string
   eo_number: number
   key_industries: string[]
+  shard: string
 }
 
+// Built by propagate/search_index.py: each term maps to a flat list of
+// [position, score, position, score, ...], where position indexes `eos`
+type SearchIndex = {
+  terms: Record<string, number[]>
+}
+
+// must match STOPWORDS in propagate/search_index.py
+const STOPWORDS = new Set(
+  "a an and are as at be by for from has in is it its of on or that the this to was were will with".split(" ")
+)
+
 const metaList = [
   {
     label: "Signing Date",
@@ -197,11 +209,8 @@ function createEoSummary(eo: Eo) {
   return summary
 }
 
-function createEoDetails(eo: Eo) {
-  const details = el("div", {
-    class: "flex flex-col mt-10 md:mt-0 gap-6 w-5/6 m-auto md:w-3/4 text-slate-700",
-  })
-
+function renderEoDetails(details: HTMLElement, eo: Eo) {
+  details.innerHTML = ""
   for (const detail of detailsList) {
     const detailItem = el("div", {})
 
@@ -217,17 +226,54 @@ function createEoDetails(eo: Eo) {
 
     details.appendChild(detailItem)
   }
+}
+
+// Full records live in per-president/year shards and are only fetched once
+// one of their EOs scrolls into view
+const detailsObserver = new IntersectionObserver((entries) => {
+  for (const entry of entries) {
+    if (!entry.isIntersecting) continue
+    const details = entry.target as HTMLElement
+    detailsObserver.unobserve(details)
+    const eoNumber = Number(details.dataset.eoNumber)
+    getShard(details.dataset.shard ?? "").then((shard) => {
+      const eo = shard.get(eoNumber)
+      if (eo) renderEoDetails(details, eo)
+    })
+  }
+}, { rootMargin: "500px" })
+
+function createEoDetails(eo: Eo) {
+  const details = el("div", {
+    class: "flex flex-col mt-10 md:mt-0 gap-6 w-5/6 m-auto md:w-3/4 text-slate-700",
+    "data-eo-number": eo.eo_number.toString(),
+    "data-shard": eo.shard,
+  })
+  renderEoDetails(details, eo)
+  detailsObserver.observe(details)
 
   return details
 }
 
+function getShard(shard: string) {
+  let records = shards.get(shard)
+  if (!records) {
+    records = fetch(`/details/${shard}.json`)
+      .then((res) => res.json())
+      .then((shardJson) => new Map<number, Eo>(shardJson.eos.map((eo: Eo) => [eo.eo_number, eo])))
+    shards.set(shard, records)
+  }
+  return records
+}
+
 async function getEos() {
   if (eos.length > 0) {
     return { eos, buildTime }
   }
-  const eoJson = await fetch("/eo.json").then((res) => res.json())
-  eos = eoJson.eos
-  buildTime = eoJson.build_time
+  // slim index: enough to render the list, search it and find each EO's shard
+  const indexJson = await fetch("/index.json").then((res) => res.json())
+  eos = indexJson.eos
+  buildTime = indexJson.build_time
   return { eos, buildTime }
 }
 
@@ -249,32 +295,63 @@ function buildEoList(eos: Eo[]) {
   }
 }
 
-function initializeFuse() {
-  const options = {
-    keys: [
-      'title',
-      'summary', 
-      'purpose',
-      'deeper_dive',
-      'economic_effects',
-      'geopolitical_effects',
-      'positive_impacts',
-      'negative_impacts',
-      'key_industries',
-      'categories.policy_domain',
-      'categories.regulatory_impact',
-      'categories.constitutional_authority',
-      'categories.political_context'
-    ],
-    threshold: 0.4,
-    includeScore: true
+function getSearchIndex() {
+  if (!searchIndex) {
+    searchIndex = fetch("/search.json").then((res) => res.json())
   }
-  fuse = new Fuse(eos, options)
+  return searchIndex
 }
 
-function handleSearch(query: string) {
+function rawTokens(text: string) {
+  return text.toLowerCase().match(/[a-z0-9]+/g) ?? []
+}
+
+function tokenize(text: string) {
+  return rawTokens(text).filter((token) => token.length > 1 && !STOPWORDS.has(token))
+}
+
+async function search(query: string) {
+  const { terms } = await getSearchIndex()
+  let tokens = tokenize(query)
+  // the last token may still be being typed, so it matches as a prefix
+  let firstPrefix = tokens.length - 1
+  if (tokens.length === 0) {
+    // stopwords are not indexed, so a query made only of them falls back to
+    // its raw tokens, each matched as a prefix of the indexed terms
+    tokens = rawTokens(query)
+    firstPrefix = 0
+  }
+  let scores: Map<number, number> | null = null
+
+  for (const [i, token] of tokens.entries()) {
+    const matches = i >= firstPrefix
+      ? Object.keys(terms).filter((term) => term.startsWith(token))
+      : (token in terms ? [token] : [])
+
+    const tokenScores = new Map<number, number>()
+    for (const term of matches) {
+      const postings = terms[term]
+      for (let j = 0; j < postings.length; j += 2) {
+        tokenScores.set(postings[j], (tokenScores.get(postings[j]) ?? 0) + postings[j + 1])
+      }
+    }
+
+    // every token has to match
+    scores = scores === null
+      ? tokenScores
+      : new Map([...scores].filter(([position]) => tokenScores.has(position))
+        .map(([position, score]): [number, number] => [position, score + tokenScores.get(position)!]))
+  }
+
+  return [...(scores ?? new Map<number, number>())]
+    .sort((a, b) => b[1] - a[1])
+    .map(([position]) => eos[position])
+    .filter((eo): eo is Eo => eo !== undefined)
+}
+
+async function handleSearch(query: string) {
   const searchResults = document.getElementById('search-results')
-  if (!fuse || !searchResults) return
+  if (!searchResults) return
   
   if (!query.trim()) {
     buildEoList(eos)
@@ -282,10 +359,9 @@ function handleSearch(query: string) {
     return
   }
   
-  const results = fuse.search(query)
-  const filteredEos = results.map(result => result.item)
+  const results = await search(query)
   
-  buildEoList(filteredEos)
+  buildEoList(results)
   searchResults.textContent = `Found ${results.length} result${results.length !== 1 ? 's' : ''} for "${query}"`
 }
 
@@ -293,8 +369,13 @@ function setupSearchInput() {
   const searchInput = document.getElementById('search-input') as HTMLInputElement
   if (!searchInput) return
 
+  // most visits never search, so the index is only fetched once the user
+  // shows intent; the debounce leaves it time to arrive
+  searchInput.addEventListener('focus', () => getSearchIndex(), { once: true })
+
   let debounceTimer: ReturnType<typeof setTimeout>
   searchInput.addEventListener('input', (e) => {
+    getSearchIndex()
     const query = (e.target as HTMLInputElement).value
     clearTimeout(debounceTimer)
     debounceTimer = setTimeout(() => handleSearch(query), 1000)
@@ -303,7 +384,6 @@ function setupSearchInput() {
 
 async function main() {
   await getEos()
-  initializeFuse()
   buildEoList(eos)
   setupSearchInput()
   